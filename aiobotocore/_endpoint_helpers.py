@@ -41,9 +41,11 @@ class ClientResponseContentProxy(wrapt.ObjectProxy):
     you want to pass around the "Body" of the response without closing the
     response itself."""
 
-    def __init__(self, response):
+    def __init__(self, response, drain_policy=None):
         super().__init__(response.__wrapped__.content)
         self._self_response = response
+        # see aiobotocore.response.DrainPolicy
+        self._self_drain_policy = drain_policy
 
     # Note: we don't have a __del__ method as the ClientResponse has a __del__
     # which will warn the user if they didn't close/release the response
@@ -55,6 +57,8 @@ class ClientResponseContentProxy(wrapt.ObjectProxy):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._self_drain_policy is not None:
+            await self._self_drain_policy.release(self._self_response)
         return await self._self_response.__aexit__(exc_type, exc_val, exc_tb)
 
     @property
@@ -62,7 +66,10 @@ class ClientResponseContentProxy(wrapt.ObjectProxy):
         return self._self_response.url
 
     def close(self):
-        self._self_response.close()
+        if self._self_drain_policy is not None:
+            self._self_drain_policy.release_soon(self._self_response)
+        else:
+            self._self_response.close()
 
 
 class ClientResponseProxy(wrapt.ObjectProxy):
@@ -74,6 +81,8 @@ class ClientResponseProxy(wrapt.ObjectProxy):
 
         # this matches ClientResponse._body
         self._self_body = None
+        # set by the endpoint, see aiobotocore.response.DrainPolicy
+        self._self_drain_policy = None
 
     @property
     def status_code(self):
@@ -92,7 +101,7 @@ class ClientResponseProxy(wrapt.ObjectProxy):
 
     @property
     def raw(self):
-        return ClientResponseContentProxy(self)
+        return ClientResponseContentProxy(self, self._self_drain_policy)
 
     async def read(self):
         self._self_body = await self.__wrapped__.read()
@@ -44,10 +44,20 @@ class AioClientArgsCreator(ClientArgsCreator):
         # aiobotocore addition
         if isinstance(client_config, AioConfig):
             connector_args = client_config.connector_args
+            presign_cache = client_config.presign_cache
+            refresh_credentials_in_background = \
+                client_config.refresh_credentials_in_background
+            drain_policy = client_config.drain_policy
         else:
             connector_args = None
+            presign_cache = None
+            refresh_credentials_in_background = False
+            drain_policy = None
 
-        new_config = AioConfig(connector_args, **config_kwargs)
+        new_config = AioConfig(
+            connector_args, presign_cache=presign_cache,
+            refresh_credentials_in_background=refresh_credentials_in_background,
+            drain_policy=drain_policy, **config_kwargs)
         endpoint_creator = AioEndpointCreator(event_emitter)
 
         endpoint = endpoint_creator.create_endpoint(
@@ -59,7 +69,8 @@ class AioClientArgsCreator(ClientArgsCreator):
             timeout=(new_config.connect_timeout, new_config.read_timeout),
             socket_options=socket_options,
             client_cert=new_config.client_cert,
-            connector_args=new_config.connector_args)
+            connector_args=new_config.connector_args,
+            drain_policy=new_config.drain_policy)
 
         serializer = botocore.serialize.create_serializer(
             protocol, parameter_validation)
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+
+from botocore.auth import SigV4Auth, SIGNED_HEADERS_BLACKLIST
+from botocore.compat import ensure_unicode
+
+
+class SigningKeyCache:
+    """LRU cache of derived SigV4 signing keys.
+
+    The key derived from the secret key only depends on the date, region and
+    service of the credential scope, so it changes once a day per scope
+    instead of on every request.
+    """
+
+    def __init__(self, max_size=128):
+        self._max_size = max_size
+        self._keys = OrderedDict()
+
+    def get_signing_key(self, auth, secret_key, date):
+        cache_key = (secret_key, date, auth._region_name, auth._service_name)
+        signing_key = self._keys.get(cache_key)
+        if signing_key is not None:
+            self._keys.move_to_end(cache_key)
+            return signing_key
+
+        k_date = auth._sign(('AWS4' + secret_key).encode('utf-8'), date)
+        k_region = auth._sign(k_date, auth._region_name)
+        k_service = auth._sign(k_region, auth._service_name)
+        signing_key = auth._sign(k_service, 'aws4_request')
+
+        self._keys[cache_key] = signing_key
+        if len(self._keys) > self._max_size:
+            self._keys.popitem(last=False)
+        return signing_key
+
+
+_signing_key_cache = SigningKeyCache()
+
+
+class _HeadersToSign(dict):
+    """Lower cased header name -> list of values.
+
+    Implements the part of the ``HTTPHeaders`` interface used by
+    ``SigV4Auth`` without its linear time lookups.
+    """
+
+    def get_all(self, name, failobj=None):
+        return self.get(name, failobj)
+
+
+class _SigV4FastPathMixin:
+    def headers_to_sign(self, request):
+        header_map = _HeadersToSign()
+        for name, value in request.headers.items():
+            lname = name.lower()
+            if lname not in SIGNED_HEADERS_BLACKLIST:
+                header_map.setdefault(lname, []).append(value)
+        if 'host' not in header_map:
+            header_map['host'] = [self._canonical_host(request.url).lower()]
+        return header_map
+
+    def canonical_headers(self, headers_to_sign):
+        headers = []
+        for key in sorted(headers_to_sign):
+            values = headers_to_sign[key]
+            if len(values) == 1:
+                value = self._header_value(values[0])
+            else:
+                value = ','.join(
+                    self._header_value(v) for v in sorted(values))
+            headers.append('%s:%s' % (key, ensure_unicode(value)))
+        return '\n'.join(headers)
+
+    def signed_headers(self, headers_to_sign):
+        return ';'.join(sorted(headers_to_sign))
+
+    def signature(self, string_to_sign, request):
+        signing_key = _signing_key_cache.get_signing_key(
+            self, self.credentials.secret_key,
+            request.context['timestamp'][0:8])
+        return self._sign(signing_key, string_to_sign, hex=True)
+
+
+_fast_auth_classes = {}
+
+
+def get_fast_auth_class(cls):
+    """Return a variant of a SigV4 based auth class which caches the derived
+    signing key and builds the canonical headers without ``HTTPHeaders``.
+
+    Other auth classes are returned unchanged.
+    """
+    if not isinstance(cls, type) or not issubclass(cls, SigV4Auth):
+        return cls
+    fast_cls = _fast_auth_classes.get(cls)
+    if fast_cls is None:
+        fast_cls = type(cls.__name__, (_SigV4FastPathMixin, cls), {})
+        _fast_auth_classes[cls] = fast_cls
+    return fast_cls
@@ -1,15 +1,22 @@
+import copy
+import functools
+
 from botocore.awsrequest import prepare_request_dict
 from botocore.client import logger, PaginatorDocstring, ClientCreator, \
-    BaseClient, ClientEndpointBridge, S3ArnParamHandler, S3EndpointSetter
-from botocore.exceptions import OperationNotPageableError
+    BaseClient, ClientEndpointBridge, S3ArnParamHandler, S3EndpointSetter, \
+    ClientMeta
+from botocore.exceptions import OperationNotPageableError, \
+    PartialCredentialsError
 from botocore.history import get_global_history_recorder
+from botocore.model import ServiceModel
 from botocore.utils import get_service_module_name
 from botocore.waiter import xform_name
 from botocore.hooks import first_non_none_response
 
 from .paginate import AioPaginator
-from .args import AioClientArgsCreator
-from .utils import AioS3RegionRedirector
+from .config import AioConfig
+from .loaders import load_service_model
+from .signers import AioRequestSigner
 from . import waiter
 
 history_recorder = get_global_history_recorder()
@@ -24,7 +31,7 @@ class AioClientCreator(ClientCreator):
         responses = await self._event_emitter.emit(
             'choose-service-name', service_name=service_name)
         service_name = first_non_none_response(responses, default=service_name)
-        service_model = self._load_service_model(service_name, api_version)
+        service_model = await self._load_service_model(service_name, api_version)
         cls = await self._create_client_class(service_name, service_model)
         endpoint_bridge = ClientEndpointBridge(
             self._endpoint_resolver, scoped_config, client_config,
@@ -33,6 +40,10 @@ class AioClientCreator(ClientCreator):
             service_model, region_name, is_secure, endpoint_url,
             verify, credentials, scoped_config, client_config, endpoint_bridge)
         service_client = cls(**client_args)
+        # used by AioBaseClient.bind to re-resolve the endpoint for a region
+        service_client._resolve_endpoint_config = functools.partial(
+            endpoint_bridge.resolve, service_model.endpoint_prefix,
+            endpoint_url=endpoint_url, is_secure=is_secure)
         self._register_retries(service_client)
         self._register_s3_events(
             service_client, endpoint_bridge, endpoint_url, client_config,
@@ -45,6 +56,12 @@ class AioClientCreator(ClientCreator):
         )
         return service_client
 
+    async def _load_service_model(self, service_name, api_version=None):
+        json_model = await load_service_model(
+            self._loader, service_name, 'service-2', api_version=api_version)
+        service_model = ServiceModel(json_model, service_name=service_name)
+        return service_model
+
     async def _create_client_class(self, service_name, service_model):
         class_attributes = self._create_methods(service_model)
         py_name_to_operation_name = self._create_name_mapping(service_model)
@@ -63,6 +80,7 @@ class AioClientCreator(ClientCreator):
                             client_config, scoped_config):
         if client.meta.service_model.service_name != 's3':
             return
+        from .utils import AioS3RegionRedirector
         AioS3RegionRedirector(endpoint_bridge, client).register()
         S3ArnParamHandler().register(client.meta.events)
         S3EndpointSetter(
@@ -80,6 +98,8 @@ class AioClientCreator(ClientCreator):
                          scoped_config, client_config, endpoint_bridge):
         # This is a near copy of ClientCreator. What's replaced
         # is ClientArgsCreator->AioClientArgsCreator
+        # NOTE: imported here as it pulls in aiohttp, see session.py
+        from .args import AioClientArgsCreator
         args_creator = AioClientArgsCreator(
             self._event_emitter, self._user_agent,
             self._response_parser_factory, self._loader,
@@ -90,6 +110,15 @@ class AioClientCreator(ClientCreator):
 
 
 class AioBaseClient(BaseClient):
+    # set by AioClientCreator, None for clients created by other means
+    _resolve_endpoint_config = None
+
+    # set on the views returned by bind(), which don't own the http session
+    _bound_parent = None
+
+    # credentials refreshed in the background while the client is open
+    _background_refreshed_credentials = None
+
     async def _async_getattr(self, item):
         event_name = 'getattr.%s.%s' % (
             self._service_model.service_id.hyphenize(), item
@@ -106,7 +135,8 @@ class AioBaseClient(BaseClient):
         raise AttributeError(
             "'%s' object has no attribute '%s'" % (self.__class__.__name__, item))
 
-    async def _make_api_call(self, operation_name, api_params):
+    async def _make_api_call(self, operation_name, api_params,
+                             output_shape=None):
         operation_model = self._service_model.operation_model(operation_name)
         service_name = self._service_model.service_name
         history_recorder.record('API_CALL', {
@@ -122,7 +152,14 @@ class AioBaseClient(BaseClient):
             'client_config': self.meta.config,
             'has_streaming_input': operation_model.has_streaming_input,
             'auth_type': operation_model.auth_type,
+            # lets the signer registered by the parent client defer to the
+            # signer of a view created by bind()
+            'request_signer': self._request_signer,
         }
+        if output_shape is not None:
+            # parse the response into this shape instead of the operation's
+            # output shape, see AioPageIterator.search
+            request_context['output_shape'] = output_shape
         request_dict = await self._convert_to_request_dict(
             api_params, operation_model, context=request_context)
 
@@ -175,7 +212,7 @@ class AioBaseClient(BaseClient):
             api_params, operation_model)
         if not self._client_config.inject_host_prefix:
             request_dict.pop('host_prefix', None)
-        prepare_request_dict(request_dict, endpoint_url=self._endpoint.host,
+        prepare_request_dict(request_dict, endpoint_url=self.meta.endpoint_url,
                              user_agent=self._client_config.user_agent,
                              context=context)
         return request_dict
@@ -287,13 +324,107 @@ class AioBaseClient(BaseClient):
         return waiter.create_waiter_with_client(
             mapping[waiter_name], model, self)
 
+    def bind(self, region_name=None, aws_access_key_id=None,
+             aws_secret_access_key=None, aws_session_token=None,
+             credentials=None):
+        """Return a view of this client with different credentials/region.
+
+        The view shares this client's connection pool, serializer, parser
+        and event handlers, only the request signer differs, so creating one
+        is cheap compared to creating a new client.  The view does not own
+        the connection pool: entering, exiting or closing it is a no-op and
+        it must not be used after this client has been closed.
+
+        :type region_name: str
+        :param region_name: The region to sign requests for.  The endpoint
+            is re-resolved for this region unless the client was created
+            with an explicit ``endpoint_url``.
+
+        :type credentials: aiobotocore.credentials.AioCredentials
+        :param credentials: Credentials to sign with, for example an
+            ``AioRefreshableCredentials`` from an assume role fetcher.  Can
+            not be combined with the ``aws_*`` key arguments.
+
+        :rtype: AioBaseClient
+        :return: A client view bound to the given credentials and region.
+        """
+        if aws_access_key_id is not None or \
+                aws_secret_access_key is not None:
+            from .credentials import AioCredentials
+            if aws_access_key_id is None or aws_secret_access_key is None:
+                raise PartialCredentialsError(
+                    provider='explicit',
+                    cred_var='aws_access_key_id' if aws_access_key_id is None
+                    else 'aws_secret_access_key')
+            credentials = AioCredentials(
+                access_key=aws_access_key_id,
+                secret_key=aws_secret_access_key,
+                token=aws_session_token)
+        parent = self._bound_parent or self
+        signer = self._request_signer
+        if credentials is None:
+            credentials = signer._credentials
+
+        client_config = self._client_config
+        endpoint_url = self.meta.endpoint_url
+        signing_region = signer._region_name
+        signing_name = signer._signing_name
+        if region_name is not None and region_name != self.meta.region_name:
+            if self._resolve_endpoint_config is None:
+                raise ValueError(
+                    "Client was not created by a session, can not bind "
+                    "it to region: %s" % region_name)
+            endpoint_config = self._resolve_endpoint_config(
+                region_name=region_name)
+            client_config = client_config.merge(
+                AioConfig(region_name=region_name))
+            endpoint_url = endpoint_config['endpoint_url']
+            signing_region = endpoint_config['signing_region']
+            signing_name = endpoint_config['signing_name']
+
+        view = copy.copy(self)
+        view._bound_parent = parent
+        view._client_config = client_config
+        view._request_signer = AioRequestSigner(
+            self._service_model.service_id, signing_region, signing_name,
+            signer._signature_version, credentials, self.meta.events)
+        view.meta = ClientMeta(
+            self.meta.events, client_config, endpoint_url,
+            self._service_model, self._PY_TO_OP_NAME, self.meta.partition)
+        return view
+
     async def __aenter__(self):
-        await self._endpoint.http_session.__aenter__()
+        if self._bound_parent is None:
+            await self._endpoint.http_session.__aenter__()
+            self._start_background_credential_refresh()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self._endpoint.http_session.__aexit__(exc_type, exc_val, exc_tb)
+        if self._bound_parent is None:
+            await self._stop_background_credential_refresh()
+            await self._endpoint.http_session.__aexit__(
+                exc_type, exc_val, exc_tb)
 
     async def close(self):
         """Close all http connections."""
+        if self._bound_parent is not None:
+            # the connection pool belongs to the parent client
+            return
+        await self._stop_background_credential_refresh()
         return await self._endpoint.http_session.close()
+
+    def _start_background_credential_refresh(self):
+        if not getattr(self._client_config,
+                       'refresh_credentials_in_background', False):
+            return
+        from .credentials import AioRefreshableCredentials
+        credentials = self._request_signer._credentials
+        if isinstance(credentials, AioRefreshableCredentials):
+            credentials.start_background_refresh()
+            self._background_refreshed_credentials = credentials
+
+    async def _stop_background_credential_refresh(self):
+        credentials = self._background_refreshed_credentials
+        if credentials is not None:
+            self._background_refreshed_credentials = None
+            await credentials.stop_background_refresh()
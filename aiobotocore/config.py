@@ -6,9 +6,20 @@ from botocore.exceptions import ParamValidationError
 
 class AioConfig(botocore.client.Config):
 
-    def __init__(self, connector_args=None, **kwargs):
+    def __init__(self, connector_args=None, presign_cache=None,
+                 refresh_credentials_in_background=False, drain_policy=None,
+                 **kwargs):
         super().__init__(**kwargs)
 
+        # see aiobotocore.signers.PresignedUrlCache
+        self.presign_cache = presign_cache
+        # see AioRefreshableCredentials.start_background_refresh, started
+        # and stopped when entering and exiting the client
+        self.refresh_credentials_in_background = \
+            refresh_credentials_in_background
+        # see aiobotocore.response.DrainPolicy
+        self.drain_policy = drain_policy
+
         self._validate_connector_args(connector_args)
         self.connector_args = copy.copy(connector_args)
         if not self.connector_args:
@@ -25,7 +36,19 @@ class AioConfig(botocore.client.Config):
         # Adapted from parent class
         config_options = copy.copy(self._user_provided_options)
         config_options.update(other_config._user_provided_options)
-        return AioConfig(self.connector_args, **config_options)
+        presign_cache = getattr(other_config, 'presign_cache', None)
+        if presign_cache is None:
+            presign_cache = self.presign_cache
+        refresh_credentials_in_background = \
+            self.refresh_credentials_in_background or getattr(
+                other_config, 'refresh_credentials_in_background', False)
+        drain_policy = getattr(other_config, 'drain_policy', None)
+        if drain_policy is None:
+            drain_policy = self.drain_policy
+        return AioConfig(
+            self.connector_args, presign_cache=presign_cache,
+            refresh_credentials_in_background=refresh_credentials_in_background,
+            drain_policy=drain_policy, **config_options)
 
     @staticmethod
     def _validate_connector_args(connector_args):
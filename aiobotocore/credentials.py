@@ -1,8 +1,13 @@
 import asyncio
 import datetime
 import logging
+import os
+import random
 import subprocess
 import json
+import tempfile
+import time
+from collections import OrderedDict
 from copy import deepcopy
 from typing import Optional
 from hashlib import sha1
@@ -12,6 +17,7 @@ from dateutil.tz import tzutc
 from botocore import UNSIGNED
 from botocore.config import Config
 import botocore.compat
+import botocore.configloader
 from botocore.credentials import EnvProvider, Credentials, RefreshableCredentials, \
     ReadOnlyCredentials, ContainerProvider, ContainerMetadataFetcher, \
     _parse_if_needed, InstanceMetadataProvider, _get_client_creator, \
@@ -20,7 +26,7 @@ from botocore.credentials import EnvProvider, Credentials, RefreshableCredential
     CachedCredentialFetcher, _serialize_if_needed, BaseAssumeRoleCredentialFetcher, \
     AssumeRoleProvider, AssumeRoleCredentialFetcher, CredentialResolver, \
     CanonicalNameCredentialSourcer, BotoProvider, OriginalEC2Provider, \
-    SSOProvider
+    SSOProvider, JSONFileCache
 from botocore.exceptions import UnauthorizedSSOTokenError
 from botocore.exceptions import MetadataRetrievalError, CredentialRetrievalError, \
     InvalidConfigError, PartialCredentialsError, RefreshWithMFAUnsupportedError, \
@@ -31,15 +37,61 @@ from botocore.utils import SSOTokenLoader
 from aiobotocore.utils import AioContainerMetadataFetcher, AioInstanceMetadataFetcher
 from aiobotocore.config import AioConfig
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 
 logger = logging.getLogger(__name__)
 
 
-def create_credential_resolver(session, cache=None, region_name=None):
+class _MtimeCachedParser:
+    """Wraps a config file parser, re-using the parsed file until its
+    modification time or size change.
+
+    The parsed config is shared, it must not be modified.
+    """
+
+    def __init__(self, parser):
+        self._parser = parser
+        self._cache = {}
+
+    def __call__(self, path):
+        path = os.path.expandvars(os.path.expanduser(path))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # let the parser raise the appropriate error
+            return self._parser(path)
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        parsed = self._parser(path)
+        self._cache[path] = (key, parsed)
+        return parsed
+
+
+_cached_raw_config_parse = _MtimeCachedParser(
+    botocore.configloader.raw_config_parse)
+_cached_load_config = _MtimeCachedParser(botocore.configloader.load_config)
+
+
+async def _run_in_executor(func, *args):
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+def create_credential_resolver(session, cache=None, region_name=None,
+                               probe_concurrently=False):
     """Create a default credential resolver.
         This creates a pre-configured credential resolver
         that includes the default lookup chain for
         credentials.
+
+        See ``AioCredentialResolver`` for ``probe_concurrently``.
         """
     profile_name = session.get_config_variable('profile') or 'default'
     metadata_timeout = session.get_config_variable('metadata_service_timeout')
@@ -114,7 +166,8 @@ def create_credential_resolver(session, cache=None, region_name=None):
         logger.debug('Skipping environment variable credential check'
                      ' because profile name was explicitly set.')
 
-    resolver = AioCredentialResolver(providers=providers)
+    resolver = AioCredentialResolver(
+        providers=providers, probe_concurrently=probe_concurrently)
     return resolver
 
 
@@ -214,9 +267,17 @@ class AioCredentials(Credentials):
 
 
 class AioRefreshableCredentials(RefreshableCredentials):
+    # The background refresh happens up to this many seconds before the
+    # advisory refresh window, to spread out refreshes of many processes
+    _background_refresh_jitter = 60
+    # Seconds to wait before retrying a failed background refresh
+    _background_refresh_retry_interval = 30
+
     def __init__(self, *args, **kwargs):
         super(AioRefreshableCredentials, self).__init__(*args, **kwargs)
         self._refresh_lock = asyncio.Lock()
+        self._background_refresh_task = None
+        self._background_refresh_users = 0
 
     @classmethod
     def from_refreshable_credentials(cls, obj: Optional[RefreshableCredentials]):
@@ -316,6 +377,65 @@ class AioRefreshableCredentials(RefreshableCredentials):
         await self._refresh()
         return self._frozen_credentials
 
+    def start_background_refresh(self):
+        """Refresh the credentials in a background task ahead of expiry.
+
+        The refresh happens a random amount of time (up to
+        ``_background_refresh_jitter`` seconds) before the advisory refresh
+        window, so signing requests never has to wait on the network.  This
+        is reference counted, every call must be paired with a call to
+        :meth:`stop_background_refresh`, the task is cancelled once all the
+        users stopped it.  Must be called from a running event loop.
+        """
+        self._background_refresh_users += 1
+        if self._background_refresh_task is None:
+            self._background_refresh_task = asyncio.ensure_future(
+                self._background_refresh())
+
+    async def stop_background_refresh(self):
+        if self._background_refresh_users == 0:
+            return
+        self._background_refresh_users -= 1
+        if self._background_refresh_users or \
+                self._background_refresh_task is None:
+            return
+        task = self._background_refresh_task
+        self._background_refresh_task = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def _seconds_until_background_refresh(self):
+        if self._expiry_time is None:
+            # deferred credentials which were never loaded
+            return 0
+        jitter = random.uniform(0, self._background_refresh_jitter)
+        return (self._seconds_remaining() -
+                self._advisory_refresh_timeout - jitter)
+
+    async def _background_refresh(self):
+        while True:
+            delay = self._seconds_until_background_refresh()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                async with self._refresh_lock:
+                    await self._protected_refresh(is_mandatory=False)
+            except Exception:
+                logger.warning("Background refresh of temporary credentials "
+                               "failed.", exc_info=True)
+
+            # Wait between refreshes even when they succeeded: the refresh
+            # may have failed, returned the same credentials (e.g. IMDS only
+            # rotates them shortly before they expire) or credentials which
+            # are already inside the refresh window (e.g. an AssumeRole
+            # DurationSeconds below the advisory timeout).  Requests will
+            # still refresh inline if the credentials are about to expire.
+            await asyncio.sleep(self._background_refresh_retry_interval)
+
 
 class AioDeferredRefreshableCredentials(AioRefreshableCredentials):
     def __init__(self, refresh_using, method, time_fetcher=_local_now):
@@ -326,6 +446,8 @@ class AioDeferredRefreshableCredentials(AioRefreshableCredentials):
         self._expiry_time = None
         self._time_fetcher = time_fetcher
         self._refresh_lock = asyncio.Lock()
+        self._background_refresh_task = None
+        self._background_refresh_users = 0
         self.method = method
         self._frozen_credentials = None
 
@@ -337,6 +459,135 @@ class AioDeferredRefreshableCredentials(AioRefreshableCredentials):
         )
 
 
+class _FileLock:
+    """Exclusive inter-process lock on a file.
+
+    The file is opened in a thread executor, then a non-blocking ``flock``
+    is polled so waiting for the lock doesn't tie up an executor thread and
+    can be cancelled.  The lock is given up, logging a
+    warning, once ``timeout`` seconds have passed.  On platforms without
+    ``fcntl`` this does nothing.
+    """
+    _POLL_INTERVAL = 0.05
+
+    def __init__(self, path, timeout):
+        self._path = path
+        self._timeout = timeout
+        self._fd = None
+
+    def _open_and_lock(self):
+        fd = os.open(self._path, os.O_WRONLY | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return fd, False
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd, True
+
+    @staticmethod
+    def _close_opened(future):
+        if not future.cancelled() and future.exception() is None:
+            os.close(future.result()[0])
+
+    async def __aenter__(self):
+        if fcntl is None:
+            return self
+        # opening the file can block, e.g. on a network home directory
+        loop = asyncio.get_event_loop()
+        future = loop.run_in_executor(None, self._open_and_lock)
+        try:
+            fd, locked = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(self._close_opened)
+            raise
+        deadline = time.monotonic() + self._timeout
+        while True:
+            try:
+                if not locked:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    logger.warning('Timed out waiting for lock %s, '
+                                   'continuing without it', self._path)
+                    return self
+                await asyncio.sleep(self._POLL_INTERVAL)
+            except BaseException:
+                os.close(fd)
+                raise
+            else:
+                self._fd = fd
+                return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._fd is not None:
+            # closing the file releases the lock
+            os.close(self._fd)
+            self._fd = None
+
+
+class AioJSONFileCache(JSONFileCache):
+    """JSON file cache which can be shared by several processes.
+
+    On top of the dict like interface of ``JSONFileCache`` this provides
+    :meth:`async_get` and :meth:`async_set`, which do the file IO in a
+    thread executor, and :meth:`lock` to serialize fetching the value of a
+    key across processes.  Entries are replaced atomically so readers never
+    see a partially written file.
+
+    Pass it as the ``cache`` of
+    :func:`aiobotocore.credentials.create_credential_resolver` so all the
+    workers of a pre-fork server share the credentials of assumed roles::
+
+        resolver = create_credential_resolver(session, cache=AioJSONFileCache())
+        session.register_component('credential_provider', resolver)
+    """
+
+    def __init__(self, working_dir=JSONFileCache.CACHE_DIR, lock_timeout=60):
+        super(AioJSONFileCache, self).__init__(working_dir)
+        self._lock_timeout = lock_timeout
+
+    def __setitem__(self, cache_key, value):
+        full_key = self._convert_cache_key(cache_key)
+        try:
+            file_content = json.dumps(value, default=_serialize_if_needed)
+        except (TypeError, ValueError):
+            raise ValueError("Value cannot be cached, must be "
+                             "JSON serializable: %s" % value)
+        os.makedirs(self._working_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._working_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(file_content)
+            os.replace(tmp_path, full_key)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def async_get(self, cache_key):
+        """Return the cached value, or None if there is none."""
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(
+                None, self.__getitem__, cache_key)
+        except KeyError:
+            return None
+
+    async def async_set(self, cache_key, value):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.__setitem__, cache_key, value)
+
+    def lock(self, cache_key):
+        """Return an async context manager holding an exclusive lock on
+        ``cache_key`` shared by all the processes using this directory.
+        """
+        os.makedirs(self._working_dir, exist_ok=True)
+        path = os.path.join(self._working_dir, cache_key + '.lock')
+        return _FileLock(path, self._lock_timeout)
+
+
 class AioCachedCredentialFetcher(CachedCredentialFetcher):
     async def _get_credentials(self):
         raise NotImplementedError('_get_credentials()')
@@ -350,12 +601,15 @@ class AioCachedCredentialFetcher(CachedCredentialFetcher):
         This will check the cache for up-to-date credentials, calling assume
         role if none are available.
         """
-        response = self._load_from_cache()
-        if response is None:
-            response = await self._get_credentials()
-            self._write_to_cache(response)
+        if isinstance(self._cache, AioJSONFileCache):
+            response = await self._get_from_file_cache()
         else:
-            logger.debug("Credentials for role retrieved from cache.")
+            response = self._load_from_cache()
+            if response is None:
+                response = await self._get_credentials()
+                self._write_to_cache(response)
+            else:
+                logger.debug("Credentials for role retrieved from cache.")
 
         creds = response['Credentials']
         expiration = _serialize_if_needed(creds['Expiration'], iso=True)
@@ -366,6 +620,33 @@ class AioCachedCredentialFetcher(CachedCredentialFetcher):
             'expiry_time': expiration,
         }
 
+    async def _get_from_file_cache(self):
+        response = await self._async_load_from_cache()
+        if response is not None:
+            logger.debug("Credentials for role retrieved from cache.")
+            return response
+
+        # Only one process fetches the credentials, the others wait for it
+        # and read them from the cache
+        async with self._cache.lock(self._cache_key):
+            response = await self._async_load_from_cache()
+            if response is None:
+                response = await self._get_credentials()
+                await self._cache.async_set(self._cache_key, response)
+            else:
+                logger.debug("Credentials for role retrieved from cache.")
+        return response
+
+    async def _async_load_from_cache(self):
+        creds = await self._cache.async_get(self._cache_key)
+        if creds is None:
+            return None
+        if self._is_expired(creds):
+            logger.debug(
+                "Credentials were found in cache, but they are expired.")
+            return None
+        return creds
+
 
 class AioBaseAssumeRoleCredentialFetcher(BaseAssumeRoleCredentialFetcher,
                                          AioCachedCredentialFetcher):
@@ -407,7 +688,8 @@ class AioAssumeRoleWithWebIdentityCredentialFetcher(
 
     async def _get_credentials(self):
         """Get credentials by calling assume role."""
-        kwargs = self._assume_role_kwargs()
+        # reads the token file
+        kwargs = await _run_in_executor(self._assume_role_kwargs)
         # Assume role with web identity does not require credentials other than
         # the token, explicitly configure the client to not sign requests.
         config = AioConfig(signature_version=UNSIGNED)
@@ -518,25 +800,48 @@ class AioOriginalEC2Provider(OriginalEC2Provider):
         return result
 
 
+# NOTE: the file based providers below read and parse their files in a
+#       thread executor, the files may be on a slow network mount
+
+
 class AioSharedCredentialProvider(SharedCredentialProvider):
+    def __init__(self, creds_filename, profile_name=None, ini_parser=None):
+        if ini_parser is None:
+            ini_parser = _cached_raw_config_parse
+        super(AioSharedCredentialProvider, self).__init__(
+            creds_filename, profile_name=profile_name, ini_parser=ini_parser)
+
     async def load(self):
-        result = super(AioSharedCredentialProvider, self).load()
+        result = await _run_in_executor(
+            super(AioSharedCredentialProvider, self).load)
         if isinstance(result, Credentials):
             result = AioCredentials.from_credentials(result)
         return result
 
 
 class AioConfigProvider(ConfigProvider):
+    def __init__(self, config_filename, profile_name, config_parser=None):
+        if config_parser is None:
+            config_parser = _cached_load_config
+        super(AioConfigProvider, self).__init__(
+            config_filename, profile_name, config_parser=config_parser)
+
     async def load(self):
-        result = super(AioConfigProvider, self).load()
+        result = await _run_in_executor(super(AioConfigProvider, self).load)
         if isinstance(result, Credentials):
             result = AioCredentials.from_credentials(result)
         return result
 
 
 class AioBotoProvider(BotoProvider):
+    def __init__(self, environ=None, ini_parser=None):
+        if ini_parser is None:
+            ini_parser = _cached_raw_config_parse
+        super(AioBotoProvider, self).__init__(
+            environ=environ, ini_parser=ini_parser)
+
     async def load(self):
-        result = super(AioBotoProvider, self).load()
+        result = await _run_in_executor(super(AioBotoProvider, self).load)
         if isinstance(result, Credentials):
             result = AioCredentials.from_credentials(result)
         return result
@@ -802,11 +1107,31 @@ class AioContainerProvider(ContainerProvider):
 
 
 class AioCredentialResolver(CredentialResolver):
+    """
+    :type probe_concurrently: bool
+    :param probe_concurrently: Query the container and instance metadata
+        providers concurrently with the providers before them instead of in
+        turn, so their timeouts don't add up when no credentials are
+        configured.  The providers keep their precedence, the credentials of
+        the first provider in the chain which has some are returned and the
+        probes of the providers after it are cancelled.
+    """
+    # providers which may wait on the network for a long time
+    _concurrent_provider_types = (AioContainerProvider,
+                                  AioInstanceMetadataProvider)
+
+    def __init__(self, providers, probe_concurrently=False):
+        super(AioCredentialResolver, self).__init__(providers)
+        self.probe_concurrently = probe_concurrently
+
     async def load_credentials(self):
         """
         Goes through the credentials chain, returning the first ``Credentials``
         that could be loaded.
         """
+        if self.probe_concurrently:
+            return await self._load_credentials_concurrently()
+
         # First provider to return a non-None response wins.
         for provider in self.providers:
             logger.debug("Looking for credentials via: %s", provider.METHOD)
@@ -822,6 +1147,34 @@ class AioCredentialResolver(CredentialResolver):
         # -js
         return None
 
+    async def _load_credentials_concurrently(self):
+        probes = {}
+        for provider in self.providers:
+            if isinstance(provider, self._concurrent_provider_types):
+                logger.debug("Probing for credentials via: %s",
+                             provider.METHOD)
+                probes[provider] = asyncio.ensure_future(provider.load())
+
+        try:
+            for provider in self.providers:
+                logger.debug("Looking for credentials via: %s",
+                             provider.METHOD)
+                probe = probes.pop(provider, None)
+                if probe is not None:
+                    creds = await probe
+                else:
+                    creds = await provider.load()
+                if creds is not None:
+                    return creds
+            return None
+        finally:
+            # the credentials of the providers after the one which returned
+            # or raised aren't needed anymore
+            for probe in probes.values():
+                probe.cancel()
+            if probes:
+                await asyncio.gather(*probes.values(), return_exceptions=True)
+
 
 class AioSSOCredentialFetcher(AioCachedCredentialFetcher):
     _UTC_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
@@ -866,7 +1219,8 @@ class AioSSOCredentialFetcher(AioCachedCredentialFetcher):
             kwargs = {
                 'roleName': self._role_name,
                 'accountId': self._account_id,
-                'accessToken': self._token_loader(self._start_url),
+                'accessToken': await _run_in_executor(
+                    self._token_loader, self._start_url),
             }
             try:
                 response = await client.get_role_credentials(**kwargs)
@@ -906,3 +1260,113 @@ class AioSSOProvider(SSOProvider):
             method=self.METHOD,
             refresh_using=sso_fetcher.fetch_credentials,
         )
+
+
+class AioAssumeRoleCredentialPool:
+    """Credentials for many assumed roles, sharing one STS client.
+
+    Meant for jobs which fan out over many accounts.  The credentials of the
+    ``max_size`` most recently used roles are kept, concurrent requests
+    for the credentials of one role share a single AssumeRole call, and at
+    most ``max_concurrent_calls`` AssumeRole calls are in flight at once.
+    The credentials are refreshed ahead of their expiry, in the background
+    if ``refresh_in_background`` is set::
+
+        async with session.create_client('sts') as sts, \\
+                session.create_client('ec2') as ec2:
+            pool = AioAssumeRoleCredentialPool(sts)
+            for role_arn in role_arns:
+                account_ec2 = pool.bind(ec2, role_arn, region_name='eu-west-1')
+                await account_ec2.describe_instances()
+
+    :type sts_client: AioBaseClient
+    :param sts_client: The STS client to call AssumeRole with, calls are
+        made through views of it (see ``AioBaseClient.bind``) so they share
+        its connection pool.
+
+    :type source_credentials: AioCredentials
+    :param source_credentials: The credentials to assume the roles with,
+        defaults to the credentials of ``sts_client``.
+    """
+
+    def __init__(self, sts_client, source_credentials=None, max_size=128,
+                 max_concurrent_calls=8, extra_args=None, cache=None,
+                 expiry_window_seconds=None, refresh_in_background=False):
+        if source_credentials is None:
+            source_credentials = sts_client._request_signer._credentials
+        self._sts_client = sts_client
+        self._source_credentials = source_credentials
+        self._max_size = max_size
+        self._extra_args = extra_args or {}
+        self._cache = cache
+        self._expiry_window_seconds = expiry_window_seconds
+        self._refresh_in_background = refresh_in_background
+        self._credentials = OrderedDict()
+        self._max_concurrent_calls = max_concurrent_calls
+        # created on first use, to bind to the running event loop
+        self._sts_semaphore = None
+
+    def get_credentials(self, role_arn, extra_args=None):
+        """Return the credentials of ``role_arn``.
+
+        The credentials are fetched when they are first used.
+
+        :type extra_args: dict
+        :param extra_args: Arguments of the AssumeRole call for this role,
+            on top of the pool's ``extra_args``.
+
+        :rtype: AioDeferredRefreshableCredentials
+        """
+        assume_role_args = dict(self._extra_args, **(extra_args or {}))
+        key = (role_arn, json.dumps(assume_role_args, sort_keys=True))
+        credentials = self._credentials.get(key)
+        if credentials is not None:
+            self._credentials.move_to_end(key)
+            return credentials
+
+        fetcher = AioAssumeRoleCredentialFetcher(
+            client_creator=self._create_client,
+            source_credentials=self._source_credentials,
+            role_arn=role_arn,
+            extra_args=assume_role_args,
+            cache=self._cache,
+            expiry_window_seconds=self._expiry_window_seconds,
+        )
+
+        async def refresh():
+            if self._sts_semaphore is None:
+                self._sts_semaphore = asyncio.Semaphore(
+                    self._max_concurrent_calls)
+            async with self._sts_semaphore:
+                return await fetcher.fetch_credentials()
+
+        credentials = AioDeferredRefreshableCredentials(
+            method=AioAssumeRoleProvider.METHOD, refresh_using=refresh)
+        if self._refresh_in_background:
+            credentials.start_background_refresh()
+
+        self._credentials[key] = credentials
+        if len(self._credentials) > self._max_size:
+            _, evicted = self._credentials.popitem(last=False)
+            if self._refresh_in_background:
+                asyncio.ensure_future(evicted.stop_background_refresh())
+        return credentials
+
+    def bind(self, client, role_arn, region_name=None, extra_args=None):
+        """Return a view of ``client`` signing with the credentials of
+        ``role_arn``, see ``AioBaseClient.bind``.
+        """
+        return client.bind(
+            region_name=region_name,
+            credentials=self.get_credentials(role_arn, extra_args))
+
+    async def close(self):
+        """Stop refreshing the credentials in the background."""
+        credentials = list(self._credentials.values())
+        self._credentials.clear()
+        if self._refresh_in_background:
+            for creds in credentials:
+                await creds.stop_background_refresh()
+
+    def _create_client(self, service_name, **kwargs):
+        return self._sts_client.bind(**kwargs)
@@ -53,16 +53,18 @@ async def convert_to_response_dict(http_response, operation_model):
         response_dict['body'] = http_response.raw
     elif operation_model.has_streaming_output:
         length = response_dict['headers'].get('content-length')
-        response_dict['body'] = StreamingBody(http_response.raw, length)
+        response_dict['body'] = StreamingBody(
+            http_response.raw, length, headers=response_dict['headers'])
     else:
         response_dict['body'] = await http_response.read()
     return response_dict
 
 
 class AioEndpoint(Endpoint):
-    def __init__(self, *args, proxies=None, **kwargs):
+    def __init__(self, *args, proxies=None, drain_policy=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.proxies = proxies or {}
+        self._drain_policy = drain_policy
 
     async def create_request(self, params, operation_model=None):
         request = create_request_object(params)
@@ -118,7 +120,7 @@ class AioEndpoint(Endpoint):
         # If an exception occurs then the success_response is None.
         # If no exception occurs then exception is None.
         success_response, exception = await self._do_get_response(
-            request, operation_model)
+            request, operation_model, context)
         kwargs_to_emit = {
             'response_dict': None,
             'parsed_response': None,
@@ -136,7 +138,7 @@ class AioEndpoint(Endpoint):
                 service_id, operation_model.name), **kwargs_to_emit)
         return success_response, exception
 
-    async def _do_get_response(self, request, operation_model):
+    async def _do_get_response(self, request, operation_model, context=None):
         try:
             logger.debug("Sending http request: %s", request)
             history_recorder.record('HTTP_REQUEST', {
@@ -177,8 +179,10 @@ class AioEndpoint(Endpoint):
 
         protocol = operation_model.metadata['protocol']
         parser = self._response_parser_factory.create_parser(protocol)
-        parsed_response = parser.parse(
-            response_dict, operation_model.output_shape)
+        output_shape = (context or {}).get('output_shape')
+        if output_shape is None:
+            output_shape = operation_model.output_shape
+        parsed_response = parser.parse(response_dict, output_shape)
         if http_response.status_code >= 300:
             self._add_modeled_error_fields(
                 response_dict, parsed_response,
@@ -240,6 +244,7 @@ class AioEndpoint(Endpoint):
         url = URL(url, encoded=True)
         resp = await self.http_session.request(
             request.method, url=url, headers=headers_, data=data, proxy=proxy)
+        resp._self_drain_policy = self._drain_policy
 
         # If we're not streaming, read the content so we can retry any timeout
         #  errors, see:
@@ -260,7 +265,8 @@ class AioEndpointCreator(EndpointCreator):
                         proxies=None,
                         socket_options=None,
                         client_cert=None,
-                        connector_args=None):
+                        connector_args=None,
+                        drain_policy=None):
         if not is_valid_endpoint_url(endpoint_url):
 
             raise ValueError("Invalid endpoint: %s" % endpoint_url)
@@ -323,4 +329,5 @@ class AioEndpointCreator(EndpointCreator):
             event_emitter=self._event_emitter,
             response_parser_factory=response_parser_factory,
             http_session=aio_session,
-            proxies=proxies)
+            proxies=proxies,
+            drain_policy=drain_policy)
@@ -0,0 +1,139 @@
+import asyncio
+import functools
+import logging
+import os
+import pickle
+import tempfile
+
+import botocore
+from botocore.loaders import Loader
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the snapshot changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class AioLoader(Loader):
+    """Loader which reads and parses the data files in a thread executor.
+
+    Some of the service models are several MB of JSON, reading and parsing
+    them on the event loop would stall every other coroutine.  Concurrent
+    loads of the same file share a single executor job, and files which
+    were already loaded are returned from the loader's cache without
+    leaving the event loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending_loads = {}
+
+    async def async_load_service_model(self, service_name, type_name,
+                                       api_version=None):
+        return await self._load_in_executor(
+            self.load_service_model, service_name, type_name, api_version)
+
+    async def async_load_data(self, name):
+        return await self._load_in_executor(self.load_data, name)
+
+    async def _load_in_executor(self, method, *args):
+        # NOTE: this matches the key botocore's instance_cache uses for
+        #       positional arguments
+        key = (method.__name__,) + args
+        if key in self._cache:
+            return self._cache[key]
+
+        future = self._pending_loads.get(key)
+        if future is None:
+            loop = asyncio.get_event_loop()
+            future = loop.run_in_executor(
+                None, functools.partial(method, *args))
+            self._pending_loads[key] = future
+            future.add_done_callback(
+                lambda _: self._pending_loads.pop(key, None))
+
+        # shield so a cancelled caller doesn't cancel the load for the others
+        return await asyncio.shield(future)
+
+    def save_snapshot(self, path):
+        """Write everything this loader has loaded so far to ``path``.
+
+        The snapshot is a pickle of the loader's cache, loading it with
+        :meth:`load_snapshot` skips reading and parsing the JSON files.
+        The file is replaced atomically.
+        """
+        snapshot = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'botocore_version': botocore.__version__,
+            'search_paths': list(self.search_paths),
+            'cache': dict(self._cache),
+        }
+        dirname = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load_snapshot(self, path):
+        """Populate this loader's cache from a snapshot written by
+        :meth:`save_snapshot`.
+
+        Snapshots written by another botocore version or for other search
+        paths are ignored, the models are then loaded from the JSON files
+        as usual.
+
+        :return: Whether the snapshot was used.
+        """
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+        expected = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'botocore_version': botocore.__version__,
+            'search_paths': list(self.search_paths),
+        }
+        for name, value in expected.items():
+            if snapshot.get(name) != value:
+                logger.warning(
+                    'Ignoring model snapshot %s, its %s is %r instead of %r',
+                    path, name, snapshot.get(name), value)
+                return False
+        self._cache.update(snapshot['cache'])
+        return True
+
+
+async def load_service_model(loader, service_name, type_name,
+                             api_version=None):
+    """Load a service model without blocking the event loop when possible.
+
+    Loaders registered by the user which aren't an ``AioLoader`` are called
+    synchronously.
+    """
+    if isinstance(loader, AioLoader):
+        return await loader.async_load_service_model(
+            service_name, type_name, api_version)
+    return loader.load_service_model(
+        service_name, type_name, api_version=api_version)
+
+
+def create_loader(search_path_string=None):
+    """Create an AioLoader given an AWS_DATA_PATH search string.
+
+    :type search_path_string: str
+    :param search_path_string: The AWS_DATA_PATH value.  A string
+        of data path values separated by the ``os.path.pathsep`` value.
+
+    :return: An ``AioLoader`` instance.
+    """
+    if search_path_string is None:
+        return AioLoader()
+    paths = []
+    extra_paths = search_path_string.split(os.pathsep)
+    for path in extra_paths:
+        path = os.path.expanduser(os.path.expandvars(path))
+        paths.append(path)
+    return AioLoader(extra_search_paths=paths)
@@ -1,16 +1,187 @@
+import asyncio
+import copy
+import functools
+from collections import OrderedDict, deque
+
 from botocore.exceptions import PaginationError
-from botocore.paginate import Paginator, PageIterator
+from botocore.paginate import Paginator, PageIterator, TokenEncoder
 from botocore.utils import set_value_from_jmespath, merge_dicts
 from botocore.compat import six
 
 import jmespath
-import aioitertools
+
+
+_END_OF_PAGES = object()
+
+# Members the handlers botocore registers for an operation's after-call
+# event expect in the response, so they are kept when projecting it.  See
+# botocore.handlers.decode_list_object and friends.
+_HANDLER_REQUIRED_MEMBERS = {
+    ('s3', 'ListObjects'): '[Contents[].Key, CommonPrefixes[].Prefix]',
+    ('s3', 'ListObjectsV2'): '[Contents[].Key, CommonPrefixes[].Prefix]',
+    ('s3', 'ListObjectVersions'):
+        '[Versions[].Key, DeleteMarkers[].Key, CommonPrefixes[].Prefix]',
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_expression(expression):
+    """Compile a JMESPath expression, the last 256 expressions are cached."""
+    return jmespath.compile(expression)
+
+
+def _merge_fields(first, second):
+    # A fields spec is either None, meaning the whole value is needed, or a
+    # dict of member name -> fields spec of that member.  Lists are
+    # transparent, the spec of a list applies to each of its elements.
+    if first is None or second is None:
+        return None
+    merged = dict(first)
+    for name, fields in second.items():
+        if name in merged:
+            fields = _merge_fields(merged[name], fields)
+        merged[name] = fields
+    return merged
+
+
+def _chain_fields(left, right):
+    # ``right`` is evaluated against the values ``left`` selects
+    if left is None:
+        return right
+    return {name: _chain_fields(fields, right)
+            for name, fields in left.items()}
+
+
+def _referenced_fields(node):
+    """Return the fields spec of the values a JMESPath AST node reads."""
+    node_type = node['type']
+    children = node['children']
+    if node_type == 'field':
+        return {node['value']: None}
+    if node_type == 'literal':
+        return {}
+    if node_type in ('subexpression', 'pipe', 'projection',
+                     'index_expression'):
+        return _chain_fields(_referenced_fields(children[0]),
+                             _referenced_fields(children[1]))
+    if node_type == 'flatten':
+        return _referenced_fields(children[0])
+    if node_type == 'filter_projection':
+        return _chain_fields(
+            _referenced_fields(children[0]),
+            _merge_fields(_referenced_fields(children[1]),
+                          _referenced_fields(children[2])))
+    if node_type == 'value_projection':
+        # the member names the projection applies to aren't known
+        return _chain_fields(_referenced_fields(children[0]), None)
+    if node_type in ('multi_select_list', 'multi_select_dict',
+                     'key_val_pair', 'comparator', 'or_expression',
+                     'and_expression', 'not_expression',
+                     'function_expression'):
+        if any(child['type'] == 'expref' for child in children):
+            # the expression is applied to values of another argument
+            return None
+        fields = {}
+        for child in children:
+            fields = _merge_fields(fields, _referenced_fields(child))
+        return fields
+    # current node, index, slice or anything else: the whole value
+    return None
+
+
+def _project_shape(shape, fields):
+    if fields is None:
+        return shape
+    if shape.type_name == 'list':
+        projected = copy.copy(shape)
+        projected.member = _project_shape(shape.member, fields)
+        return projected
+    if shape.type_name != 'structure':
+        # the names of map keys aren't known either
+        return shape
+    members = OrderedDict()
+    for name, member in shape.members.items():
+        if name in fields:
+            members[name] = _project_shape(member, fields[name])
+    projected = copy.copy(shape)
+    # shadows the cached properties of the shape
+    projected.members = members
+    return projected
+
+
+@functools.lru_cache(maxsize=256)
+def _projected_output_shape(operation_model, expressions):
+    output_shape = operation_model.output_shape
+    fields = {}
+    for expression in expressions:
+        fields = _merge_fields(
+            fields, _referenced_fields(_compile_expression(expression).parsed))
+    if fields is None:
+        return output_shape
+    # Scalars of the top level structure are cheap to parse and handlers
+    # may rely on them, e.g. on EncodingType.
+    payload = output_shape.serialization.get('payload')
+    for name, member in output_shape.members.items():
+        if name == payload:
+            fields.setdefault(name, {})
+        elif member.type_name not in ('structure', 'list', 'map'):
+            fields[name] = None
+    return _project_shape(output_shape, fields)
 
 
 class AioPageIterator(PageIterator):
+    # Number of pages to fetch ahead of the consumer, see AioPaginator.paginate
+    _prefetch = 0
+
     def __aiter__(self):
+        if self._prefetch > 0:
+            return self._prefetch_pages()
         return self.__anext__()
 
+    async def _prefetch_pages(self):
+        # The pages are requested by a task which runs ahead of the consumer
+        # while fewer than ``_prefetch`` pages are requested or waiting.  It
+        # is the only one making requests, so the tokens are still sent in
+        # order and MaxItems is applied as without prefetching.
+        queue = asyncio.Queue()
+        # a slot is taken before requesting a page and given back once the
+        # consumer took the page
+        slots = asyncio.Semaphore(self._prefetch)
+        producer = asyncio.ensure_future(self._fetch_pages(queue, slots))
+        try:
+            while True:
+                page, error = await queue.get()
+                slots.release()
+                if error is not None:
+                    raise error
+                if page is _END_OF_PAGES:
+                    break
+                yield page
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
+    async def _fetch_pages(self, queue, slots):
+        pages = self.__anext__()
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    page = await pages.__anext__()
+                except StopAsyncIteration:
+                    break
+                queue.put_nowait((page, None))
+        except Exception as e:
+            queue.put_nowait((None, e))
+        else:
+            queue.put_nowait((_END_OF_PAGES, None))
+        finally:
+            await pages.aclose()
+
     async def __anext__(self):
         current_kwargs = self._op_kwargs
         previous_next_token = None
@@ -80,13 +251,25 @@ class AioPageIterator(PageIterator):
                 self._inject_token_into_kwargs(current_kwargs, next_token)
                 previous_next_token = next_token
 
-    def result_key_iters(self):
-        teed_results = aioitertools.tee(self, len(self.result_keys))
-        return [ResultKeyIterator(i, result_key) for i, result_key
-                in zip(teed_results, self.result_keys)]
+    def result_key_iters(self, max_buffered_pages=None):
+        """Return an iterator over the results of each result key.
+
+        The pages are requested once and each result key's part of them is
+        buffered until its iterator consumes it.  With
+        ``max_buffered_pages`` set, an iterator which is that many pages
+        ahead of another waits for it, the iterators must then be consumed
+        concurrently.  Waiting for an iterator which wasn't started raises
+        ``PaginationError``.
+        """
+        fan_out = _ResultKeyFanOut(self, self.result_keys, max_buffered_pages)
+        return [_FanOutResultKeyIterator(fan_out, i, result_key)
+                for i, result_key in enumerate(self.result_keys)]
 
     async def build_full_result(self):
         complete_result = {}
+        # The value of each result key in complete_result, kept so it
+        # doesn't have to be searched again for every page
+        aggregated_values = [None] * len(self.result_keys)
         async for response in self:
             page = response
             # We want to try to catch operation object pagination
@@ -100,9 +283,9 @@ class AioPageIterator(PageIterator):
             # by page.  For each page in the response we need to
             # inject the necessary components from the page
             # into the complete_result.
-            for result_expression in self.result_keys:
+            for i, result_expression in enumerate(self.result_keys):
                 # In order to incrementally update a result key
-                # we need to search the existing value from complete_result,
+                # we need the existing value from complete_result,
                 # then we need to search the _current_ page for the
                 # current result key value.  Then we append the current
                 # value onto the existing value, and re-set that value
@@ -110,28 +293,77 @@ class AioPageIterator(PageIterator):
                 result_value = result_expression.search(page)
                 if result_value is None:
                     continue
-                existing_value = result_expression.search(complete_result)
+                existing_value = aggregated_values[i]
                 if existing_value is None:
                     # Set the initial result
                     set_value_from_jmespath(
                         complete_result, result_expression.expression,
                         result_value)
+                    aggregated_values[i] = result_value
                     continue
                 # Now both result_value and existing_value contain something
                 if isinstance(result_value, list):
                     existing_value.extend(result_value)
                 elif isinstance(result_value, (int, float, six.string_types)):
                     # Modify the existing result with the sum or concatenation
+                    aggregated_values[i] = existing_value + result_value
                     set_value_from_jmespath(
                         complete_result, result_expression.expression,
-                        existing_value + result_value)
+                        aggregated_values[i])
         merge_dicts(complete_result, self.non_aggregate_part)
         if self.resume_token is not None:
             complete_result['NextToken'] = self.resume_token
         return complete_result
 
-    async def search(self, expression):
-        compiled = jmespath.compile(expression)
+    # Output shape the responses are parsed into, see search
+    _output_shape = None
+
+    def _make_request(self, current_kwargs):
+        if self._output_shape is None:
+            return self._method(**current_kwargs)
+        client = self._method.__self__
+        operation_name = client._PY_TO_OP_NAME[self._method.__name__]
+        return client._make_api_call(operation_name, current_kwargs,
+                                     output_shape=self._output_shape)
+
+    def _projected_output_shape(self, expression):
+        client = getattr(self._method, '__self__', None)
+        op_names = getattr(client, '_PY_TO_OP_NAME', {})
+        operation_name = op_names.get(getattr(self._method, '__name__', None))
+        if operation_name is None:
+            return None
+        operation_model = client.meta.service_model.operation_model(
+            operation_name)
+        if operation_model.output_shape is None:
+            return None
+
+        # Besides the expression, paginating needs the tokens and the
+        # number of results on each page.
+        expressions = [expression]
+        expressions.extend(token.expression for token in self._output_token)
+        if self._more_results is not None:
+            expressions.append(self._more_results.expression)
+        expressions.extend('{}[][`0`]'.format(result_key.expression)
+                           for result_key in self.result_keys)
+        expressions.extend(key.expression
+                           for key in self._non_aggregate_key_exprs)
+        required = _HANDLER_REQUIRED_MEMBERS.get(
+            (operation_model.service_model.endpoint_prefix, operation_name))
+        if required is not None:
+            expressions.append(required)
+        return _projected_output_shape(operation_model, tuple(expressions))
+
+    async def search(self, expression, project=False):
+        """Yield the results of a JMESPath expression over each page.
+
+        :type project: bool
+        :param project: Only parse the parts of the responses the expression
+            and the pagination read.  The pages built while searching are
+            then incomplete.
+        """
+        compiled = _compile_expression(expression)
+        if project:
+            self._output_shape = self._projected_output_shape(expression)
         async for page in self:
             results = compiled.search(page)
             if isinstance(results, list):
@@ -144,6 +376,23 @@ class AioPageIterator(PageIterator):
 class AioPaginator(Paginator):
     PAGE_ITERATOR_CLS = AioPageIterator
 
+    def paginate(self, prefetch=0, **kwargs):
+        """Create paginator object for an operation.
+
+        This returns an async iterable object.  Iterating over
+        this object will yield a single page of a response
+        at a time.
+
+        :type prefetch: int
+        :param prefetch: Request up to this many pages ahead while the
+            previous pages are being processed, so the processing and the
+            round trips to the service overlap.  Note that ``resume_token``
+            may then be set before the page it follows was consumed.
+        """
+        page_iterator = super(AioPaginator, self).paginate(**kwargs)
+        page_iterator._prefetch = prefetch
+        return page_iterator
+
 
 class ResultKeyIterator:
     """Iterates over the results of paginated responses.
@@ -173,3 +422,430 @@ class ResultKeyIterator:
                 results = []
             for result in results:
                 yield result
+
+
+class _ResultKeyFanOut:
+    """Reads the pages of a page iterator once, on behalf of the iterators
+    of its result keys.
+
+    Only the part of each page matching a result key is buffered for that
+    key's iterator, the pages themselves aren't kept.
+    """
+
+    def __init__(self, pages, result_keys, max_buffered_pages=None):
+        self._pages = pages.__aiter__()
+        self._result_keys = result_keys
+        self._max_buffered_pages = max_buffered_pages
+        self._buffers = [deque() for _ in result_keys]
+        self._fetching = None
+        self._consumed = None
+        self._done = False
+        self._error = None
+        self._started = [False] * len(result_keys)
+
+    async def get_results(self, index):
+        """Return the results of the next page for result key ``index``,
+        or None once all the pages were read.
+        """
+        self._started[index] = True
+        buffer = self._buffers[index]
+        yielded = False
+        while not buffer:
+            if self._error is not None:
+                raise self._error
+            if self._done:
+                return None
+            if self._fetching is None and not self._has_room():
+                # another iterator is too far behind, wait for it
+                if not all(self._started[i] for i in self._full_buffers()):
+                    if not yielded:
+                        # it may be about to start, e.g. with gather()
+                        yielded = True
+                        await asyncio.sleep(0)
+                        continue
+                    raise PaginationError(message=(
+                        'The result key iterators are more than %d pages '
+                        'apart and the one behind was not started, consume '
+                        'them concurrently or pass max_buffered_pages=None'
+                        % self._max_buffered_pages))
+                if self._consumed is None:
+                    loop = asyncio.get_event_loop()
+                    self._consumed = loop.create_future()
+                # shield so a cancelled iterator doesn't cancel the future
+                # the others are waiting for
+                await asyncio.shield(self._consumed)
+            else:
+                if self._fetching is None:
+                    self._fetching = asyncio.ensure_future(self._fetch_page())
+                # shield so a cancelled iterator doesn't cancel the request
+                # the others are waiting for
+                await asyncio.shield(self._fetching)
+
+        results = buffer.popleft()
+        if self._consumed is not None:
+            if not self._consumed.done():
+                self._consumed.set_result(None)
+            self._consumed = None
+        return results
+
+    def _has_room(self):
+        if self._max_buffered_pages is None:
+            return True
+        return all(len(buffer) < self._max_buffered_pages
+                   for buffer in self._buffers)
+
+    def _full_buffers(self):
+        return [i for i, buffer in enumerate(self._buffers)
+                if len(buffer) >= self._max_buffered_pages]
+
+    async def _fetch_page(self):
+        try:
+            page = await self._pages.__anext__()
+        except StopAsyncIteration:
+            self._done = True
+        except Exception as e:
+            # raised to every iterator by get_results
+            self._error = e
+        else:
+            for buffer, result_key in zip(self._buffers, self._result_keys):
+                results = result_key.search(page)
+                if results:
+                    buffer.append(results)
+        finally:
+            self._fetching = None
+
+
+class _FanOutResultKeyIterator(ResultKeyIterator):
+    def __init__(self, fan_out, index, result_key):
+        super().__init__(None, result_key)
+        self._fan_out = fan_out
+        self._index = index
+
+    async def __anext__(self):
+        while True:
+            results = await self._fan_out.get_results(self._index)
+            if results is None:
+                return
+            for result in results:
+                yield result
+
+
+class ParallelScanIterator:
+    """Iterates over the items of a DynamoDB Scan, scanning the segments of
+    the table concurrently.
+
+    Each of the ``total_segments`` segments is read by its own paginator,
+    at most ``max_concurrency`` of them at a time.  Their items are merged
+    into a single async iterator, in no particular order.  At most
+    ``max_buffered_pages`` pages wait for the consumer, the segments pause
+    while the buffer is full::
+
+        paginator = client.get_paginator('scan')
+        scan = ParallelScanIterator(paginator, 16, TableName='my-table')
+        async for item in scan:
+            ...
+
+    ``resume_tokens`` maps each segment to the token to resume it from, or
+    None once all the items of the segment were consumed.  A segment's
+    token only moves past a page once all the items of the page were
+    consumed, so resuming with ``starting_tokens=scan.resume_tokens`` may
+    return some items again but never skips any.
+
+    :param paginator: The ``AioPaginator`` of the ``scan`` operation.
+    :param total_segments: The number of segments to divide the table in.
+    :param max_concurrency: The number of segments read concurrently,
+        defaults to all of them.
+    :param max_buffered_pages: The number of pages read ahead of the
+        consumer, defaults to ``max_concurrency``.
+    :param starting_tokens: The ``resume_tokens`` of a previous scan.
+    :param kwargs: The arguments of the Scan calls.
+    """
+
+    def __init__(self, paginator, total_segments, max_concurrency=None,
+                 max_buffered_pages=None, starting_tokens=None, **kwargs):
+        if max_concurrency is None:
+            max_concurrency = total_segments
+        if max_buffered_pages is None:
+            max_buffered_pages = max_concurrency
+        self._paginator = paginator
+        self._total_segments = total_segments
+        self._max_concurrency = max_concurrency
+        self._max_buffered_pages = max_buffered_pages
+        self._kwargs = kwargs
+        self._token_encoder = TokenEncoder()
+        if starting_tokens is None:
+            starting_tokens = {}
+        self.resume_tokens = {
+            segment: starting_tokens.get(segment, '')
+            for segment in range(total_segments)
+        }
+
+    def __aiter__(self):
+        return self.__anext__()
+
+    async def __anext__(self):
+        queue = asyncio.Queue(maxsize=self._max_buffered_pages)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        # '' is the token of a segment which wasn't started yet
+        segments = [segment for segment, token in self.resume_tokens.items()
+                    if token is not None]
+        tasks = [
+            asyncio.ensure_future(self._scan_segment(segment, semaphore, queue))
+            for segment in segments
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                segment, page, next_token, error = await queue.get()
+                if error is not None:
+                    raise error
+                if page is _END_OF_PAGES:
+                    remaining -= 1
+                    continue
+                for item in page.get('Items', []):
+                    yield item
+                self.resume_tokens[segment] = next_token
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _scan_segment(self, segment, semaphore, queue):
+        pagination_config = {}
+        starting_token = self.resume_tokens[segment]
+        if starting_token:
+            pagination_config['StartingToken'] = starting_token
+        try:
+            async with semaphore:
+                pages = self._paginator.paginate(
+                    Segment=segment, TotalSegments=self._total_segments,
+                    PaginationConfig=pagination_config, **self._kwargs)
+                async for page in pages:
+                    next_token = pages._get_next_token(page)
+                    if all(t is None for t in next_token.values()):
+                        next_token = None
+                    else:
+                        next_token = self._token_encoder.encode(next_token)
+                    await queue.put((segment, page, next_token, None))
+        except Exception as e:
+            await queue.put((segment, None, None, e))
+        else:
+            await queue.put((segment, _END_OF_PAGES, None, None))
+
+
+class ParallelListObjectsIterator:
+    """Iterates over the objects of an S3 bucket, listing several partitions
+    of the key space concurrently.
+
+    The keys are split in partitions either at the caller's ``partitions``,
+    a sorted list of keys each partition ends at (included), or at the
+    common prefixes found by listing ``Prefix`` with ``delimiter``.  Each
+    partition is listed by its own paginator, and at most
+    ``max_concurrency`` ListObjectsV2 calls are in flight at once::
+
+        paginator = client.get_paginator('list_objects_v2')
+        objects = ParallelListObjectsIterator(paginator, Bucket='bucket')
+        async for obj in objects:
+            print(obj['Key'], obj['Size'])
+
+    The objects, the items of ``Contents``, are returned as soon as their
+    page arrives, or in key order when ``sort`` is set.  At most
+    ``max_buffered_pages`` pages wait for the consumer, when sorting this
+    is per partition listed ahead of the one being consumed.
+
+    :param paginator: The ``AioPaginator`` of the ``list_objects_v2``
+        operation.
+    :param kwargs: The arguments of the ListObjectsV2 calls.
+    """
+
+    def __init__(self, paginator, partitions=None, delimiter='/',
+                 max_concurrency=16, max_buffered_pages=None, sort=False,
+                 **kwargs):
+        if 'Delimiter' in kwargs:
+            # the partitions are listed without one, to reach every key
+            raise ValueError('Delimiter is not supported, the key space is '
+                             'split with the delimiter argument')
+        if max_buffered_pages is None:
+            max_buffered_pages = 1 if sort else max_concurrency
+        self._paginator = paginator
+        self._partitions = partitions
+        self._delimiter = delimiter
+        self._max_concurrency = max_concurrency
+        self._max_buffered_pages = max_buffered_pages
+        self._sort = sort
+        self._kwargs = kwargs
+
+    def __aiter__(self):
+        return self.__anext__()
+
+    async def __anext__(self):
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        if self._partitions is not None:
+            segments = self._split_at_partitions()
+        else:
+            segments = self._split_at_common_prefixes()
+
+        if self._sort:
+            objects = self._iter_sorted(segments, semaphore)
+        else:
+            objects = self._iter_merged(segments, semaphore)
+        try:
+            async for obj in objects:
+                yield obj
+        finally:
+            await objects.aclose()
+            await segments.aclose()
+
+    # A segment is either a list of objects which were already listed or
+    # the (kwargs, last key) of the partition to list.  The segments are
+    # generated in key order as they are needed.
+
+    async def _split_at_partitions(self):
+        start_after = self._kwargs.get('StartAfter')
+        for end in list(self._partitions) + [None]:
+            kwargs = dict(self._kwargs)
+            if start_after is not None:
+                kwargs['StartAfter'] = start_after
+            yield kwargs, end
+            start_after = end
+
+    async def _split_at_common_prefixes(self):
+        pages = self._paginator.paginate(
+            Delimiter=self._delimiter, **self._kwargs)
+        async for page in pages:
+            # the keys under a common prefix sort next to each other, so the
+            # prefixes can be listed in between the objects outside of them
+            entries = [(obj['Key'], obj, None)
+                       for obj in page.get('Contents', [])]
+            entries.extend((p['Prefix'], None, p['Prefix'])
+                           for p in page.get('CommonPrefixes', []))
+            entries.sort(key=lambda entry: entry[0])
+
+            objects = []
+            for _, obj, prefix in entries:
+                if prefix is None:
+                    objects.append(obj)
+                    continue
+                if objects:
+                    yield objects
+                    objects = []
+                yield dict(self._kwargs, Prefix=prefix), None
+            if objects:
+                yield objects
+
+    async def _iter_merged(self, segments, semaphore):
+        queue = asyncio.Queue(maxsize=self._max_buffered_pages)
+        tasks = set()
+        listing = 0
+        exhausted = False
+        try:
+            while True:
+                # list up to max_concurrency partitions at a time, the next
+                # segments are only generated once one of them is done
+                while not exhausted and listing < self._max_concurrency:
+                    try:
+                        segment = await segments.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    if isinstance(segment, list):
+                        for obj in segment:
+                            yield obj
+                        continue
+                    task = asyncio.ensure_future(
+                        self._list_segment(segment, semaphore, queue))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    listing += 1
+
+                if not listing:
+                    break
+                contents = await self._get_contents(queue)
+                if contents is _END_OF_PAGES:
+                    listing -= 1
+                    continue
+                for obj in contents:
+                    yield obj
+        finally:
+            await self._cancel(list(tasks))
+
+    async def _iter_sorted(self, segments, semaphore):
+        # the segments listed ahead of the one being consumed, as
+        # (objects, None) or (queue, task)
+        window = deque()
+        exhausted = False
+        try:
+            while True:
+                # keep listing the next partitions while this one is consumed
+                while not exhausted and len(window) < self._max_concurrency:
+                    try:
+                        segment = await segments.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    if isinstance(segment, list):
+                        window.append((segment, None))
+                        continue
+                    queue = asyncio.Queue(maxsize=self._max_buffered_pages)
+                    task = asyncio.ensure_future(
+                        self._list_segment(segment, semaphore, queue))
+                    window.append((queue, task))
+
+                if not window:
+                    break
+                # only removed once consumed, so it is cancelled otherwise
+                segment, task = window[0]
+                if task is None:
+                    for obj in segment:
+                        yield obj
+                else:
+                    while True:
+                        contents = await self._get_contents(segment)
+                        if contents is _END_OF_PAGES:
+                            break
+                        for obj in contents:
+                            yield obj
+                window.popleft()
+        finally:
+            await self._cancel(
+                [task for _, task in window if task is not None])
+
+    @staticmethod
+    async def _get_contents(queue):
+        contents, error = await queue.get()
+        if error is not None:
+            raise error
+        return contents
+
+    @staticmethod
+    async def _cancel(tasks):
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _list_segment(self, segment, semaphore, queue):
+        kwargs, last_key = segment
+        pages = self._paginator.paginate(**kwargs).__aiter__()
+        try:
+            while True:
+                # the limit applies to the requests, not to the partitions
+                # waiting for the consumer
+                async with semaphore:
+                    try:
+                        page = await pages.__anext__()
+                    except StopAsyncIteration:
+                        break
+                contents = page.get('Contents', [])
+                if last_key is not None and contents and \
+                        contents[-1]['Key'] > last_key:
+                    contents = [obj for obj in contents
+                                if obj['Key'] <= last_key]
+                    await queue.put((contents, None))
+                    break
+                await queue.put((contents, None))
+        except Exception as e:
+            await queue.put((None, e))
+        else:
+            await queue.put((_END_OF_PAGES, None))
+        finally:
+            await pages.aclose()
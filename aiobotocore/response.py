@@ -1,13 +1,189 @@
 import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import re
+import zlib
+from collections import Counter
 
 import wrapt
-from botocore.exceptions import IncompleteReadError, ReadTimeoutError
+from botocore.exceptions import ChecksumError, IncompleteReadError, \
+    ReadTimeoutError
+
+
+logger = logging.getLogger(__name__)
+
+_LINE_END_RE = re.compile(br'\r\n|\r|\n')
+_CR = ord(b'\r')
+
+
+def _check_line_length(length, max_line_length):
+    if max_line_length is not None and length > max_line_length:
+        raise ValueError('Line exceeds max_line_length of %s bytes'
+                         % max_line_length)
+
+
+async def _decompress_chunks(chunks, compression):
+    if compression == 'gzip':
+        def create_decompressor():
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError('Decompressing zstd requires the zstandard '
+                             'package')
+
+        def create_decompressor():
+            return zstandard.ZstdDecompressor().decompressobj()
+    else:
+        raise ValueError('Unsupported compression: %r' % compression)
+
+    decompressor = create_decompressor()
+    async for chunk in chunks:
+        while chunk:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+            chunk = b''
+            if decompressor.eof:
+                # concatenated gzip members or zstd frames
+                chunk = decompressor.unused_data
+                decompressor = create_decompressor()
+    data = decompressor.flush()
+    if data:
+        yield data
+
+
+class _Crc32Checksum:
+    def __init__(self):
+        self._value = 0
+
+    def update(self, data):
+        self._value = zlib.crc32(data, self._value)
+
+    def digest(self):
+        return self._value.to_bytes(4, 'big')
+
+
+class _Crc32cChecksum(_Crc32Checksum):
+    def __init__(self):
+        super().__init__()
+        try:
+            from awscrt.checksums import crc32c
+        except ImportError:
+            raise ValueError('CRC32C checksums require the awscrt package')
+        self._crc32c = crc32c
+
+    def update(self, data):
+        self._value = self._crc32c(data, self._value)
+
+
+def _create_checksum(algorithm):
+    if algorithm == 'crc32':
+        return _Crc32Checksum()
+    if algorithm == 'crc32c':
+        return _Crc32cChecksum()
+    if algorithm in ('sha256', 'md5'):
+        return hashlib.new(algorithm)
+    raise ValueError('Unsupported checksum algorithm: %r' % algorithm)
+
+
+_MD5_ETAG_RE = re.compile(r'^"?([0-9a-f]{32})"?$')
+
+
+def _expected_checksum(algorithm, headers):
+    """Return the digest the headers of a GetObject response announce for
+    the data, or None."""
+    if algorithm == 'md5':
+        # The ETag is the MD5 of the object unless it was uploaded in parts
+        # or encrypted with SSE-KMS or SSE-C.
+        match = _MD5_ETAG_RE.match(headers.get('etag', ''))
+        if match is None or 'content-range' in headers or \
+                'x-amz-server-side-encryption-customer-algorithm' in \
+                headers or \
+                headers.get('x-amz-server-side-encryption') == 'aws:kms':
+            return None
+        return binascii.unhexlify(match.group(1))
+    value = headers.get('x-amz-checksum-' + algorithm)
+    # checksums of multipart objects are checksums of the part checksums
+    if value is None or '-' in value:
+        return None
+    return base64.b64decode(value)
 
 
 class AioReadTimeoutError(ReadTimeoutError, asyncio.TimeoutError):
     pass
 
 
+class DrainPolicy:
+    """Decides what happens to the connection of a streaming response which
+    is closed before its body was read completely.
+
+    Closing the connection loses its keep-alive socket.  When at most
+    ``max_drain_size`` bytes of the body are still to be received, they are
+    read and discarded instead, within ``drain_timeout`` seconds, and the
+    connection goes back to the pool.  Larger remainders, and bodies of
+    unknown length, close the connection::
+
+        config = AioConfig(drain_policy=DrainPolicy(max_drain_size=256 * 1024))
+
+    ``stats`` counts the outcomes: ``released`` for bodies which were
+    received completely, ``drained``, ``closed`` and ``drain_failed``, whose
+    connection was closed after all.
+    """
+
+    def __init__(self, max_drain_size=64 * 1024, drain_timeout=5):
+        self.max_drain_size = max_drain_size
+        self.drain_timeout = drain_timeout
+        self.stats = Counter()
+        self._drain_tasks = set()
+
+    @staticmethod
+    def _get_remainder(response):
+        content = response.__wrapped__.content
+        if content.is_eof():
+            return 0
+        if response.content_length is None:
+            return None
+        return response.content_length - content.total_bytes
+
+    async def release(self, response):
+        """Release the connection of ``response``, draining or closing it as
+        needed."""
+        remainder = self._get_remainder(response)
+        if remainder == 0:
+            self.stats['released'] += 1
+            response.release()
+            return
+        if remainder is None or remainder > self.max_drain_size:
+            self.stats['closed'] += 1
+            response.close()
+            return
+        try:
+            await asyncio.wait_for(self._drain(response.__wrapped__.content),
+                                   self.drain_timeout)
+        except Exception:
+            logger.debug('Failed to drain response body', exc_info=True)
+            self.stats['drain_failed'] += 1
+            response.close()
+        else:
+            self.stats['drained'] += 1
+            response.release()
+
+    def release_soon(self, response):
+        """Like :meth:`release`, the body is drained in a task."""
+        task = asyncio.ensure_future(self.release(response))
+        self._drain_tasks.add(task)
+        task.add_done_callback(self._drain_tasks.discard)
+
+    @staticmethod
+    async def _drain(content):
+        while await content.readany():
+            pass
+
+
 class StreamingBody(wrapt.ObjectProxy):
     """Wrapper class for an http response body.
 
@@ -21,15 +197,25 @@ class StreamingBody(wrapt.ObjectProxy):
     """
 
     _DEFAULT_CHUNK_SIZE = 1024
+    # The default chunk size grows with the content length so that a body is
+    # read in about _CHUNKS_PER_BODY chunks, within these bounds.
+    _CHUNKS_PER_BODY = 16
+    _MAX_DEFAULT_CHUNK_SIZE = 256 * 1024
 
-    def __init__(self, raw_stream, content_length):
+    def __init__(self, raw_stream, content_length, headers=None):
         super().__init__(raw_stream)
         self._self_content_length = content_length
         self._self_amount_read = 0
+        self._self_headers = headers if headers is not None else {}
+        self._self_checksum = None
+        self._self_checksum_algorithm = None
+        self._self_expected_checksum = None
 
     # https://github.com/GrahamDumpleton/wrapt/issues/73
     async def __aenter__(self):
-        return await self.__wrapped__.__aenter__()
+        await self.__wrapped__.__aenter__()
+        # the reads have to go through this proxy to be verified
+        return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         return await self.__wrapped__.__aexit__(exc_type, exc_val, exc_tb)
@@ -40,60 +226,220 @@ class StreamingBody(wrapt.ObjectProxy):
     def tell(self):
         return self._self_amount_read
 
-    async def read(self, amt=None):
-        """Read at most amt bytes from the stream.
+    def set_checksum(self, algorithm, expected=None):
+        """Compute a checksum of the data while it is read and verify it
+        once the whole body was read.
 
-        If the amt argument is omitted, read all data.
+        :type algorithm: str
+        :param algorithm: ``'crc32'``, ``'crc32c'`` (requires the ``awscrt``
+            package), ``'sha256'`` or ``'md5'``.
+
+        :type expected: str
+        :param expected: The base64 encoded checksum to expect.  Defaults to
+            the ``x-amz-checksum-*`` header of the response, or for MD5 to the
+            ETag of objects uploaded in a single part without SSE-KMS or
+            SSE-C.  Without either the checksum is only computed, see
+            :attr:`checksum`.
+
+        :raises ChecksumError: From the read which reaches the end of the
+            body, if the checksums differ.
         """
-        # botocore to aiohttp mapping
+        if self._self_amount_read:
+            raise ValueError('The checksum must be set before reading')
+        self._self_checksum = _create_checksum(algorithm)
+        self._self_checksum_algorithm = algorithm
+        if expected is None:
+            self._self_expected_checksum = _expected_checksum(
+                algorithm, self._self_headers)
+        else:
+            self._self_expected_checksum = base64.b64decode(expected)
+
+    @property
+    def checksum(self):
+        """The base64 encoded checksum of the data read so far, see
+        :meth:`set_checksum`."""
+        if self._self_checksum is None:
+            return None
+        return base64.b64encode(self._self_checksum.digest()).decode('ascii')
+
+    def _verify_checksum(self, eof):
+        if self._self_expected_checksum is None:
+            return
+        if eof or self._self_content_length is not None and \
+                self._self_amount_read == int(self._self_content_length):
+            actual = self._self_checksum.digest()
+            if actual != self._self_expected_checksum:
+                raise ChecksumError(
+                    checksum_type=self._self_checksum_algorithm,
+                    expected_checksum=base64.b64encode(
+                        self._self_expected_checksum).decode('ascii'),
+                    actual_checksum=base64.b64encode(actual).decode('ascii'))
+
+    async def _read_raw(self, amt):
         try:
-            chunk = await self.__wrapped__.read(amt if amt is not None else -1)
+            return await self.__wrapped__.read(amt)
         except asyncio.TimeoutError as e:
             raise AioReadTimeoutError(endpoint_url=self.__wrapped__.url,
                                       error=e)
 
+    async def read(self, amt=None):
+        """Read at most amt bytes from the stream.
+
+        If the amt argument is omitted, read all data.
+        """
+        # botocore to aiohttp mapping
+        chunk = await self._read_raw(amt if amt is not None else -1)
+
         self._self_amount_read += len(chunk)
-        if amt is None or (not chunk and amt > 0):
+        if self._self_checksum is not None:
+            self._self_checksum.update(chunk)
+        eof = amt is None or (not chunk and amt > 0)
+        if eof:
             # If the server sends empty contents or
             # we ask to read all of the contents, then we know
             # we need to verify the content length.
             self._verify_content_length()
+        self._verify_checksum(eof)
         return chunk
 
+    async def readinto(self, buffer):
+        """Read at most ``len(buffer)`` bytes into the writable bytes-like
+        object ``buffer``, e.g. a ``bytearray`` or a ``memoryview`` of a
+        memory map.
+
+        The data read from the connection is copied into ``buffer``, this
+        fills a destination in place rather than saving allocations.
+
+        :return: The number of bytes read, 0 once the stream is exhausted.
+        """
+        view = memoryview(buffer).cast('B')
+        if not view.nbytes:
+            return 0
+        chunk = await self._read_raw(view.nbytes)
+        amount = len(chunk)
+        view[:amount] = chunk
+        self._self_amount_read += amount
+        if self._self_checksum is not None:
+            self._self_checksum.update(chunk)
+        if not amount:
+            self._verify_content_length()
+        self._verify_checksum(not amount)
+        return amount
+
+    async def readinto_exactly(self, buffer):
+        """Fill the writable bytes-like object ``buffer`` from the stream.
+
+        :raises IncompleteReadError: If the stream ends first.
+        """
+        view = memoryview(buffer).cast('B')
+        filled = 0
+        while filled < view.nbytes:
+            amount = await self.readinto(view[filled:])
+            if not amount:
+                raise IncompleteReadError(
+                    actual_bytes=filled, expected_bytes=view.nbytes)
+            filled += amount
+        return filled
+
+    def _default_chunk_size(self):
+        if self._self_content_length is None:
+            return self._DEFAULT_CHUNK_SIZE
+        chunk_size = int(self._self_content_length) // self._CHUNKS_PER_BODY
+        return min(max(chunk_size, self._DEFAULT_CHUNK_SIZE),
+                   self._MAX_DEFAULT_CHUNK_SIZE)
+
     def __aiter__(self):
-        """Return an iterator to yield 1k chunks from the raw stream.
+        """Return an iterator to yield chunks from the raw stream, see
+        :meth:`iter_chunks`.
         """
-        return self.iter_chunks(self._DEFAULT_CHUNK_SIZE)
+        return self.iter_chunks()
 
     async def __anext__(self):
-        """Return the next 1k chunk from the raw stream.
+        """Return the next chunk from the raw stream.
         """
-        current_chunk = await self.read(self._DEFAULT_CHUNK_SIZE)
+        current_chunk = await self.read(self._default_chunk_size())
         if current_chunk:
             return current_chunk
         raise StopAsyncIteration
 
     anext = __anext__
 
-    async def iter_lines(self, chunk_size=1024, keepends=False):
+    async def iter_lines(self, chunk_size=None, keepends=False,
+                         delimiter=None, max_line_length=None,
+                         decompress=None):
         """Return an iterator to yield lines from the raw stream.
 
         This is achieved by reading chunk of bytes (of size chunk_size) at a
         time from the raw stream, and then yielding lines from there.
+
+        :type delimiter: bytes
+        :param delimiter: Split the lines at this delimiter instead of at
+            ``\\n``, ``\\r\\n`` and ``\\r``.
+
+        :type max_line_length: int
+        :param max_line_length: Raise a ``ValueError`` instead of buffering a
+            line which is longer, excluding its line end.
+
+        :type decompress: str
+        :param decompress: Decompress the stream before splitting it, either
+            ``'gzip'`` or ``'zstd'``.  The latter requires the ``zstandard``
+            package.
         """
-        pending = b''
-        async for chunk in self.iter_chunks(chunk_size):
-            lines = (pending + chunk).splitlines(True)
-            for line in lines[:-1]:
-                yield line.splitlines(keepends)[0]
-            pending = lines[-1]
+        if delimiter is None:
+            line_end = _LINE_END_RE
+        else:
+            line_end = re.compile(re.escape(delimiter))
+        # a line end which may continue in the next chunk
+        partial_line_end = len(delimiter) - 1 if delimiter else 0
+
+        chunks = self.iter_chunks(chunk_size)
+        if decompress is not None:
+            chunks = _decompress_chunks(chunks, decompress)
+
+        pending = bytearray()
+        scan_pos = 0
+        async for chunk in chunks:
+            pending += chunk
+            line_start = 0
+            while True:
+                match = line_end.search(pending, scan_pos)
+                if match is None:
+                    scan_pos = max(line_start,
+                                   len(pending) - partial_line_end)
+                    break
+                end = match.end()
+                if end == len(pending) and delimiter is None and \
+                        pending[end - 1] == _CR:
+                    # may be the first half of \r\n
+                    scan_pos = match.start()
+                    break
+                _check_line_length(match.start() - line_start,
+                                   max_line_length)
+                yield bytes(pending[line_start:end if keepends
+                                    else match.start()])
+                line_start = scan_pos = end
+            # deleting from the start of a bytearray doesn't move the rest
+            del pending[:line_start]
+            scan_pos -= line_start
+            _check_line_length(scan_pos, max_line_length)
+
         if pending:
-            yield pending.splitlines(keepends)[0]
+            end = len(pending)
+            if not keepends and delimiter is None and \
+                    pending[end - 1] == _CR:
+                end -= 1
+            _check_line_length(end, max_line_length)
+            yield bytes(pending[:end])
 
-    async def iter_chunks(self, chunk_size=_DEFAULT_CHUNK_SIZE):
+    async def iter_chunks(self, chunk_size=None):
         """Return an iterator to yield chunks of chunk_size bytes from the raw
         stream.
+
+        By default the chunk size depends on the content length, from 1 KiB
+        up to 256 KiB.
         """
+        if chunk_size is None:
+            chunk_size = self._default_chunk_size()
         while True:
             current_chunk = await self.read(chunk_size)
             if current_chunk == b"":
@@ -1,14 +1,41 @@
+import asyncio
+
 from botocore.session import Session, EVENT_ALIASES, ServiceModel, UnknownServiceError
 
 from botocore import UNSIGNED
 from botocore import retryhandler, translate
-from botocore.exceptions import PartialCredentialsError
+from botocore.exceptions import PartialCredentialsError, DataNotFoundError
 from .client import AioClientCreator, AioBaseClient
 from .hooks import AioHierarchicalEmitter
+from .loaders import AioLoader, create_loader, load_service_model
 from .parsers import AioResponseParserFactory
 from .signers import add_generate_presigned_url, add_generate_presigned_post, \
     add_generate_db_auth_token
-from .credentials import create_credential_resolver, AioCredentials
+
+# NOTE: the credentials, args/endpoint and utils modules (and through them
+#       aiohttp) are imported on first use rather than here, which roughly
+#       halves the time it takes to import aiobotocore.
+
+_LAZY_CREDENTIALS_NAMES = ('AioCredentials', 'create_credential_resolver')
+
+
+def __getattr__(name):
+    # Keeps these names available (and patchable) as attributes of this
+    # module while importing aiobotocore.credentials on first use.
+    if name in _LAZY_CREDENTIALS_NAMES:
+        from . import credentials
+        value = getattr(credentials, name)
+        globals()[name] = value
+        return value
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def _lazy(name):
+    # a module level attribute, e.g. a patched one, takes precedence
+    try:
+        return globals()[name]
+    except KeyError:
+        return __getattr__(name)
 
 
 class ClientCreatorContext:
@@ -40,6 +67,11 @@ class AioSession(Session):
         self.register('creating-client-class.s3', add_generate_presigned_post)
         self.register('creating-client-class.rds', add_generate_db_auth_token),
 
+    def _register_data_loader(self):
+        self._components.lazy_register_component(
+            'data_loader',
+            lambda: create_loader(self.get_config_variable('data_path')))
+
     def _register_response_parser_factory(self):
         self._components.register_component('response_parser_factory',
                                             AioResponseParserFactory())
@@ -78,6 +110,7 @@ class AioSession(Session):
         event_emitter = self.get_component('event_emitter')
         response_parser_factory = self.get_component(
             'response_parser_factory')
+        AioCredentials = _lazy('AioCredentials')
         if config is not None and config.signature_version is UNSIGNED:
             credentials = None
         elif aws_access_key_id is not None and \
@@ -112,7 +145,7 @@ class AioSession(Session):
         return client
 
     def _create_credential_resolver(self):
-        return create_credential_resolver(
+        return _lazy('create_credential_resolver')(
             self, region_name=self._last_client_region_used)
 
     async def get_credentials(self):
@@ -122,7 +155,8 @@ class AioSession(Session):
         return self._credentials
 
     def set_credentials(self, access_key, secret_key, token=None):
-        self._credentials = AioCredentials(access_key, secret_key, token)
+        self._credentials = _lazy('AioCredentials')(
+            access_key, secret_key, token)
 
     async def get_service_model(self, service_name, api_version=None):
         service_description = await self.get_service_data(service_name, api_version)
@@ -133,7 +167,8 @@ class AioSession(Session):
         Retrieve the fully merged data associated with a service.
         """
         data_path = service_name
-        service_data = self.get_component('data_loader').load_service_model(
+        service_data = await load_service_model(
+            self.get_component('data_loader'),
             data_path,
             type_name='service-2',
             api_version=api_version
@@ -144,6 +179,75 @@ class AioSession(Session):
                                 service_name=service_name, session=self)
         return service_data
 
+    async def preload_models(self, service_names,
+                             type_names=('service-2', 'paginators-1',
+                                         'waiters-2')):
+        """Load the models of the given services ahead of client creation.
+
+        The models are read in a thread executor and kept in the session's
+        data loader cache, so creating the clients (and their paginators and
+        waiters) afterwards doesn't parse any JSON on the event loop.
+
+        :type service_names: list
+        :param service_names: The names of the services to load.
+
+        :type type_names: tuple
+        :param type_names: The model types to load for each service.  Missing
+            optional models (e.g. a service without waiters) are skipped.
+        """
+        loader = self.get_component('data_loader')
+        api_versions = self.get_config_variable('api_versions')
+
+        async def _preload(service_name):
+            service_data = await load_service_model(
+                loader, service_name, 'service-2',
+                api_versions.get(service_name, None))
+            # clients load the other models for the resolved api version
+            api_version = service_data['metadata']['apiVersion']
+            for type_name in type_names:
+                if type_name == 'service-2':
+                    continue
+                try:
+                    await load_service_model(
+                        loader, service_name, type_name, api_version)
+                except DataNotFoundError:
+                    pass
+
+        if isinstance(loader, AioLoader):
+            await loader.async_load_data('endpoints')
+        await asyncio.gather(*[
+            _preload(service_name) for service_name in service_names])
+
+    async def write_model_snapshot(self, path, service_names):
+        """Write the models of the given services to a snapshot file.
+
+        Meant to be run as a build step, the snapshot can then be loaded at
+        startup with :meth:`load_model_snapshot` to skip parsing the JSON
+        models.  Everything already loaded by this session is included too.
+        """
+        loader = self._get_aio_loader()
+        await self.preload_models(service_names)
+        await asyncio.get_event_loop().run_in_executor(
+            None, loader.save_snapshot, path)
+
+    async def load_model_snapshot(self, path):
+        """Load models from a snapshot written by :meth:`write_model_snapshot`.
+
+        :return: Whether the snapshot was used, a snapshot from another
+            botocore version is ignored.
+        """
+        loader = self._get_aio_loader()
+        return await asyncio.get_event_loop().run_in_executor(
+            None, loader.load_snapshot, path)
+
+    def _get_aio_loader(self):
+        loader = self.get_component('data_loader')
+        if not isinstance(loader, AioLoader):
+            raise TypeError(
+                "Model snapshots require the data_loader component to be an "
+                "AioLoader, not %s" % loader.__class__.__name__)
+        return loader
+
     async def get_available_regions(self, service_name, partition_name='aws',
                                     allow_non_regional=False):
         resolver = self._get_internal_component('endpoint_resolver')
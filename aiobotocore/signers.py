@@ -1,4 +1,8 @@
 import datetime
+import json
+import time
+from collections import OrderedDict
+
 import botocore
 import botocore.auth
 from botocore.signers import RequestSigner, UnknownSignatureVersionError, \
@@ -6,18 +10,33 @@ from botocore.signers import RequestSigner, UnknownSignatureVersionError, \
     _should_use_global_endpoint, S3PostPresigner
 from botocore.exceptions import UnknownClientMethodError
 
+from .auth import get_fast_auth_class
+
 
 class AioRequestSigner(RequestSigner):
+    # number of auth instances kept per signer, one per combination of
+    # credentials, region, signing name and signature version
+    _AUTH_CACHE_SIZE = 16
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._auth_cache = OrderedDict()
+
     async def handler(self, operation_name=None, request=None, **kwargs):
         # This is typically hooked up to the "request-created" event
         # from a client's event emitter.  When a new request is created
         # this method is invoked to sign the request.
         # Don't call this method directly.
-        return await self.sign(operation_name, request)
+        # Requests made through a view from AioBaseClient.bind carry the
+        # view's signer in their context.
+        signer = request.context.get('request_signer', self)
+        return await signer.sign(operation_name, request)
 
     async def sign(self, operation_name, request, region_name=None,
                    signing_type='standard', expires_in=None,
-                   signing_name=None):
+                   signing_name=None, signature_version=None):
+        # aiobotocore addition: signature_version lets callers signing many
+        # requests for the same operation choose the signer only once
         explicit_region_name = region_name
         if region_name is None:
             region_name = self._region_name
@@ -25,8 +44,9 @@ class AioRequestSigner(RequestSigner):
         if signing_name is None:
             signing_name = self._signing_name
 
-        signature_version = await self._choose_signer(
-            operation_name, signing_type, request.context)
+        if signature_version is None:
+            signature_version = await self._choose_signer(
+                operation_name, signing_type, request.context)
 
         # Allow mutating request before signing
         await self._event_emitter.emit(
@@ -81,7 +101,19 @@ class AioRequestSigner(RequestSigner):
                 raise botocore.exceptions.NoRegionError()
             kwargs['region_name'] = region_name
             kwargs['service_name'] = signing_name
-        auth = cls(**kwargs)
+
+        # The auth classes don't keep per request state, so an instance can
+        # be re-used until the credentials are rotated.
+        cache_key = (cls,) + tuple(sorted(kwargs.items()))
+        auth = self._auth_cache.get(cache_key)
+        if auth is not None:
+            self._auth_cache.move_to_end(cache_key)
+            return auth
+
+        auth = get_fast_auth_class(cls)(**kwargs)
+        self._auth_cache[cache_key] = auth
+        if len(self._auth_cache) > self._AUTH_CACHE_SIZE:
+            self._auth_cache.popitem(last=False)
         return auth
 
     # Alias get_auth for backwards compatibility.
@@ -125,6 +157,116 @@ class AioRequestSigner(RequestSigner):
         request.prepare()
         return request.url
 
+    async def generate_presigned_urls(self, request_dicts, operation_name,
+                                      expires_in=3600, region_name=None,
+                                      signing_name=None):
+        """Presign each of the (async) iterable of request dicts.
+
+        All the requests must be for the same operation, the signature
+        version is chosen once for all of them.  The urls are yielded in the
+        order of the request dicts.
+        """
+        signature_version = None
+        async for request_dict in _aiter(request_dicts):
+            request = create_request_object(request_dict)
+            if signature_version is None:
+                signature_version = await self._choose_signer(
+                    operation_name, 'presign-url', request.context)
+            await self.sign(operation_name, request, region_name,
+                            'presign-url', expires_in, signing_name,
+                            signature_version=signature_version)
+
+            request.prepare()
+            yield request.url
+
+
+async def _aiter(iterable):
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+class PresignedUrlCache:
+    """Expiry aware LRU cache of presigned urls and RDS auth tokens.
+
+    Pass an instance to a client with ``AioConfig(presign_cache=...)`` to
+    have ``generate_presigned_url`` and ``generate_db_auth_token`` return a
+    previously generated url for the same client method, parameters,
+    credentials and expiry while enough of its validity remains.  An
+    instance can be shared between clients.
+
+    :type max_size: int
+    :param max_size: The maximum number of urls kept, the least recently
+        used are evicted first.
+
+    :type min_remaining_ratio: float
+    :param min_remaining_ratio: The fraction of the url's validity that must
+        remain for it to be reused, e.g. with the default of 0.5 a url valid
+        for an hour is reused for 30 minutes.
+    """
+
+    def __init__(self, max_size=1024, min_remaining_ratio=0.5,
+                 time_fetcher=time.monotonic):
+        if not 0 <= min_remaining_ratio <= 1:
+            raise ValueError('min_remaining_ratio must be between 0 and 1')
+        self._max_size = max_size
+        self._min_remaining_ratio = min_remaining_ratio
+        self._time_fetcher = time_fetcher
+        self._urls = OrderedDict()
+
+    def __len__(self):
+        return len(self._urls)
+
+    def clear(self):
+        self._urls.clear()
+
+    @staticmethod
+    def make_key(client, frozen_credentials, *args):
+        # everything that changes the url of clients sharing the cache: the
+        # signature version and the S3 options (e.g. the addressing style)
+        signer = client._request_signer
+        config = (signer._signature_version, client.meta.config.s3)
+        # the params can contain non-hashable values (e.g. lists), and
+        # non-json ones (e.g. datetimes) which are fine to compare via repr
+        return (
+            client.meta.service_model.service_name,
+            client.meta.endpoint_url, client.meta.region_name,
+            frozen_credentials,
+        ) + tuple(json.dumps(arg, sort_keys=True, default=repr)
+                  for arg in (config,) + args)
+
+    def get(self, key):
+        entry = self._urls.get(key)
+        if entry is None:
+            return None
+        url, reuse_until = entry
+        if self._time_fetcher() > reuse_until:
+            del self._urls[key]
+            return None
+        self._urls.move_to_end(key)
+        return url
+
+    def put(self, key, url, expires_in):
+        reuse_for = expires_in * (1 - self._min_remaining_ratio)
+        self._urls[key] = (url, self._time_fetcher() + reuse_for)
+        self._urls.move_to_end(key)
+        while len(self._urls) > self._max_size:
+            self._urls.popitem(last=False)
+
+
+async def _get_presign_cache_key(client, *args):
+    cache = getattr(client.meta.config, 'presign_cache', None)
+    if cache is None:
+        return None, None
+    frozen_credentials = None
+    credentials = client._request_signer._credentials
+    if credentials is not None:
+        frozen_credentials = await credentials.get_frozen_credentials()
+    return cache, cache.make_key(client, frozen_credentials, *args)
+
 
 def add_generate_db_auth_token(class_attributes, **kwargs):
     class_attributes['generate_db_auth_token'] = generate_db_auth_token
@@ -152,6 +294,14 @@ async def generate_db_auth_token(self, DBHostname, Port, DBUsername, Region=None
     if region is None:
         region = self.meta.region_name
 
+    expires_in = 900
+    cache, cache_key = await _get_presign_cache_key(
+        self, 'generate_db_auth_token', DBHostname, Port, DBUsername, region)
+    if cache is not None:
+        token = cache.get(cache_key)
+        if token is not None:
+            return token
+
     params = {
         'Action': 'connect',
         'DBUser': DBUsername,
@@ -176,13 +326,17 @@ async def generate_db_auth_token(self, DBHostname, Port, DBUsername, Region=None
     prepare_request_dict(request_dict, endpoint_url)
     presigned_url = await self._request_signer.generate_presigned_url(
         operation_name='connect', request_dict=request_dict,
-        region_name=region, expires_in=900, signing_name='rds-db'
+        region_name=region, expires_in=expires_in, signing_name='rds-db'
     )
-    return presigned_url[len(scheme):]
+    token = presigned_url[len(scheme):]
+    if cache is not None:
+        cache.put(cache_key, token, expires_in)
+    return token
 
 
 def add_generate_presigned_url(class_attributes, **kwargs):
     class_attributes['generate_presigned_url'] = generate_presigned_url
+    class_attributes['generate_presigned_urls'] = generate_presigned_urls
 
 
 async def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600,
@@ -212,6 +366,15 @@ async def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600
         params = {}
     expires_in = ExpiresIn
     http_method = HttpMethod
+
+    cache, cache_key = await _get_presign_cache_key(
+        self, 'generate_presigned_url', client_method, params, expires_in,
+        http_method)
+    if cache is not None:
+        url = cache.get(cache_key)
+        if url is not None:
+            return url
+
     context = {
         'is_presign_request': True,
         'use_global_endpoint': _should_use_global_endpoint(self),
@@ -243,9 +406,78 @@ async def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600
         request_dict, endpoint_url=self.meta.endpoint_url, context=context)
 
     # Generate the presigned url.
-    return await request_signer.generate_presigned_url(
+    url = await request_signer.generate_presigned_url(
         request_dict=request_dict, expires_in=expires_in,
         operation_name=operation_name)
+    if cache is not None:
+        cache.put(cache_key, url, expires_in)
+    return url
+
+
+async def generate_presigned_urls(self, ClientMethod, ParamsIter,
+                                  ExpiresIn=3600, HttpMethod=None):
+    """Generate presigned urls for many calls of the same client method
+
+    The operation model and the signature version are resolved once and the
+    signing key is re-used, making this much cheaper than calling
+    ``generate_presigned_url`` for each set of parameters.  This is an async
+    generator, urls are yielded as they are signed, in the order of
+    ``ParamsIter``::
+
+        async for url in client.generate_presigned_urls(
+                'get_object',
+                ({'Bucket': bucket, 'Key': key} for key in keys)):
+            ...
+
+    :type ClientMethod: string
+    :param ClientMethod: The client method to presign for
+
+    :type ParamsIter: iterable or async iterable of dict
+    :param ParamsIter: The parameters normally passed to ``ClientMethod``,
+        one dict per url.
+
+    :type ExpiresIn: int
+    :param ExpiresIn: The number of seconds the presigned urls are valid
+        for. By default they expire in an hour (3600 seconds)
+
+    :type HttpMethod: string
+    :param HttpMethod: The http method to use on the generated urls. By
+        default, the http method is whatever is used in the method's model.
+
+    :returns: An async iterator of the presigned urls
+    """
+    try:
+        operation_name = self._PY_TO_OP_NAME[ClientMethod]
+    except KeyError:
+        raise UnknownClientMethodError(method_name=ClientMethod)
+
+    operation_model = self.meta.service_model.operation_model(
+        operation_name)
+    use_global_endpoint = _should_use_global_endpoint(self)
+    serializer = self._serializer
+
+    async def _request_dicts():
+        async for params in _aiter(ParamsIter):
+            # handlers may add to the context, so each request needs its own
+            context = {
+                'is_presign_request': True,
+                'use_global_endpoint': use_global_endpoint,
+            }
+            params = await self._emit_api_params(
+                params, operation_model, context)
+            request_dict = serializer.serialize_to_request(
+                params, operation_model)
+            if HttpMethod is not None:
+                request_dict['method'] = HttpMethod
+            prepare_request_dict(
+                request_dict, endpoint_url=self.meta.endpoint_url,
+                context=context)
+            yield request_dict
+
+    async for url in self._request_signer.generate_presigned_urls(
+            _request_dicts(), expires_in=ExpiresIn,
+            operation_name=operation_name):
+        yield url
 
 
 class AioS3PostPresigner(S3PostPresigner):
@@ -0,0 +1,647 @@
+import asyncio
+import base64
+import hashlib
+import io
+import mmap
+import os
+import random
+import tempfile
+import threading
+from collections import OrderedDict
+
+import aiohttp
+from botocore.exceptions import ChecksumError, ConnectionError, \
+    HTTPClientError, IncompleteReadError, ReadTimeoutError
+
+from .response import _MD5_ETAG_RE
+
+
+MB = 1024 * 1024
+
+# Errors while streaming a part's body, botocore only retries the requests
+_RETRYABLE_PART_ERRORS = (
+    IncompleteReadError, ReadTimeoutError, aiohttp.ClientPayloadError,
+    aiohttp.ClientConnectionError,
+)
+
+# Errors of the UploadPart calls which botocore gave up on retrying
+_RETRYABLE_UPLOAD_ERRORS = _RETRYABLE_PART_ERRORS + (
+    HTTPClientError, ConnectionError,
+)
+
+# S3's limits of multipart uploads
+_MIN_PART_SIZE = 5 * MB
+_MAX_PARTS = 10000
+
+# The arguments of CreateMultipartUpload which UploadPart and
+# CompleteMultipartUpload need as well
+_UPLOAD_PART_ARGS = (
+    'SSECustomerAlgorithm', 'SSECustomerKey', 'SSECustomerKeyMD5',
+    'RequestPayer', 'ExpectedBucketOwner',
+)
+_COMPLETE_UPLOAD_ARGS = ('RequestPayer', 'ExpectedBucketOwner')
+
+
+def _pwrite(fd, data, offset, lock):
+    view = memoryview(data)
+    while view:
+        if lock is None:
+            written = os.pwrite(fd, view, offset)
+        else:
+            # os.pwrite isn't available on Windows
+            with lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+
+def _content_md5(data):
+    return base64.b64encode(hashlib.md5(data).digest()).decode('ascii')
+
+
+def _read_part(fd, size, offset, lock):
+    if lock is None:
+        data = os.pread(fd, size, offset)
+    else:
+        # os.pread isn't available on Windows
+        with lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            data = os.read(fd, size)
+    return data, _content_md5(data)
+
+
+def _close_body(body):
+    if isinstance(body, _BufferReader):
+        body.close()
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable file-like object over a buffer, botocore doesn't accept
+    memoryviews as request bodies."""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = offset
+        return offset
+
+    def close(self):
+        # release the buffer, e.g. so that a memory map can be closed
+        self._view.release()
+        super().close()
+
+    def tell(self):
+        return self._position
+
+
+def _md5_of_file(filename):
+    md5 = hashlib.md5()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(MB), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class ParallelDownloader:
+    """Downloads S3 objects as concurrent ranged GetObject calls.
+
+    The object is split into parts of ``part_size`` bytes, at most
+    ``max_concurrency`` of them are requested at a time over the client's
+    connection pool.  Every part is requested with the ETag of the object
+    as ``IfMatch``, so the download fails instead of mixing two versions of
+    an object which is overwritten meanwhile::
+
+        downloader = ParallelDownloader(s3_client)
+        await downloader.download_file(
+            'model.bin', Bucket='my-bucket', Key='model.bin')
+
+    A part whose body can't be read completely is requested again, up to
+    ``max_attempts`` times.  Files are written in a thread executor in
+    chunks of ``io_chunk_size``, so at most
+    ``max_concurrency * io_chunk_size`` bytes are buffered.  Downloads into a
+    buffer read straight into it.
+
+    :param client: An S3 client.
+    :param part_size: The size of the ranges requested.
+    :param max_concurrency: The number of parts downloaded concurrently.
+    :param max_attempts: The number of times a part is requested before
+        giving up.
+    :param io_chunk_size: The size of the writes to files.
+    """
+
+    def __init__(self, client, part_size=8 * MB, max_concurrency=10,
+                 max_attempts=5, io_chunk_size=MB):
+        self._client = client
+        self._part_size = part_size
+        self._max_concurrency = max_concurrency
+        self._max_attempts = max_attempts
+        self._io_chunk_size = io_chunk_size
+
+    async def download_file(self, filename, use_mmap=False, verify_md5=False,
+                            **kwargs):
+        """Download an object to ``filename``.
+
+        The object is written to a temporary file next to ``filename`` which
+        replaces it once the download succeeded.
+
+        :param use_mmap: Read the parts into a memory map of the file instead
+            of writing them in a thread executor.
+        :param verify_md5: See :meth:`download_into`.
+        :param kwargs: The arguments of the HeadObject and GetObject calls,
+            e.g. ``Bucket``, ``Key`` and ``VersionId``.
+        :return: The HeadObject response of the object.
+        """
+        loop = asyncio.get_event_loop()
+        dirname = os.path.dirname(os.path.abspath(filename))
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+        try:
+            head = await self._client.head_object(**kwargs)
+            size = head['ContentLength']
+            await loop.run_in_executor(None, os.ftruncate, fd, size)
+            if use_mmap and size:
+                with mmap.mmap(fd, size) as buffer:
+                    await self._download(head, kwargs, self._write_into(buffer))
+                    await loop.run_in_executor(None, buffer.flush)
+            else:
+                lock = None if hasattr(os, 'pwrite') else threading.Lock()
+                await self._download(head, kwargs, self._write_to_fd(fd, lock))
+            os.close(fd)
+            fd = None
+            if verify_md5:
+                self._verify_md5(head, await loop.run_in_executor(
+                    None, _md5_of_file, tmp_path))
+            os.replace(tmp_path, filename)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            os.unlink(tmp_path)
+            raise
+        return head
+
+    async def download_into(self, buffer, verify_md5=False, **kwargs):
+        """Download an object into a writable buffer, e.g. a ``bytearray``
+        or an ``mmap`` of at least the object's size.
+
+        :param verify_md5: Compare the MD5 of the data to the ETag of the
+            object.  Objects uploaded in multiple parts or encrypted with
+            SSE-KMS or SSE-C don't have an MD5 as ETag, they are not verified.
+        :param kwargs: The arguments of the HeadObject and GetObject calls.
+        :return: The HeadObject response of the object.
+        """
+        head = await self._client.head_object(**kwargs)
+        view = memoryview(buffer).cast('B')
+        if view.nbytes < head['ContentLength']:
+            raise ValueError('The buffer is smaller than the object (%s bytes)'
+                             % head['ContentLength'])
+        await self._download(head, kwargs, self._write_into(view))
+        if verify_md5:
+            data = view[:head['ContentLength']]
+            self._verify_md5(head, await asyncio.get_event_loop()
+                             .run_in_executor(None, self._md5_of, data))
+        return head
+
+    async def download_bytes(self, verify_md5=False, **kwargs):
+        """Download an object into memory.
+
+        :return: A ``bytearray`` of the object's data.
+        """
+        head = await self._client.head_object(**kwargs)
+        buffer = bytearray(head['ContentLength'])
+        await self._download(head, kwargs, self._write_into(buffer))
+        if verify_md5:
+            self._verify_md5(head, await asyncio.get_event_loop()
+                             .run_in_executor(None, self._md5_of, buffer))
+        return buffer
+
+    @staticmethod
+    def _md5_of(data):
+        return hashlib.md5(data).hexdigest()
+
+    def _verify_md5(self, head, actual_md5):
+        match = _MD5_ETAG_RE.match(head['ETag'])
+        if match is None or head.get('SSECustomerAlgorithm') or \
+                head.get('ServerSideEncryption') == 'aws:kms':
+            return
+        if match.group(1) != actual_md5:
+            raise ChecksumError(checksum_type='md5',
+                                expected_checksum=match.group(1),
+                                actual_checksum=actual_md5)
+
+    def _write_into(self, buffer):
+        view = memoryview(buffer).cast('B')
+
+        async def write(body, start, end):
+            await body.readinto_exactly(view[start:end])
+        return write
+
+    def _write_to_fd(self, fd, lock):
+        loop = asyncio.get_event_loop()
+
+        async def write(body, start, end):
+            # one buffer per part, re-used for its writes
+            view = memoryview(bytearray(min(self._io_chunk_size, end - start)))
+            while start < end:
+                chunk = view[:min(len(view), end - start)]
+                await body.readinto_exactly(chunk)
+                await loop.run_in_executor(
+                    None, _pwrite, fd, chunk, start, lock)
+                start += len(chunk)
+        return write
+
+    async def _download(self, head, kwargs, write):
+        size = head['ContentLength']
+        kwargs = dict(kwargs, IfMatch=head['ETag'])
+        parts = iter(range(0, size, self._part_size))
+
+        async def download_parts():
+            for start in parts:
+                end = min(start + self._part_size, size)
+                await self._download_part(kwargs, start, end, write)
+
+        tasks = [asyncio.ensure_future(download_parts())
+                 for _ in range(self._max_concurrency)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _download_part(self, kwargs, start, end, write):
+        attempt = 1
+        while True:
+            response = await self._client.get_object(
+                Range='bytes=%d-%d' % (start, end - 1), **kwargs)
+            body = response['Body']
+            try:
+                await write(body, start, end)
+                return
+            except _RETRYABLE_PART_ERRORS:
+                if attempt >= self._max_attempts:
+                    raise
+            finally:
+                body.close()
+            await asyncio.sleep(random.uniform(0, 0.1 * 2 ** attempt))
+            attempt += 1
+
+
+class ParallelUploader:
+    """Uploads S3 objects in parts which are uploaded concurrently.
+
+    Objects smaller than ``multipart_threshold`` are uploaded with a single
+    PutObject call.  The others are split into parts of ``part_size``
+    bytes, made larger when needed to stay within S3's limit of 10000
+    parts, and at most ``max_concurrency`` parts are uploaded at a time::
+
+        uploader = ParallelUploader(s3_client)
+        await uploader.upload_file(
+            'model.bin', Bucket='my-bucket', Key='model.bin')
+
+    Files are read in a thread executor, one part per upload in progress,
+    so up to ``max_concurrency * part_size`` bytes are buffered, unless
+    ``max_memory`` lowers the number of concurrent uploads.  Memory mapped
+    files and buffers are uploaded without copying them.
+
+    A part which fails after botocore's retries is uploaded again, up to
+    ``max_attempts`` times.  The multipart upload is aborted when the upload
+    fails or is cancelled.
+
+    :param client: An S3 client.
+    :param multipart_threshold: The size from which objects are uploaded in
+        parts.
+    :param part_size: The size of the parts.
+    :param max_concurrency: The number of parts uploaded concurrently.
+    :param max_attempts: The number of times a part is uploaded before giving
+        up.
+    :param max_memory: The number of bytes of files read ahead of their
+        upload.
+    """
+
+    def __init__(self, client, multipart_threshold=8 * MB, part_size=8 * MB,
+                 max_concurrency=10, max_attempts=5, max_memory=None):
+        self._client = client
+        self._multipart_threshold = multipart_threshold
+        self._part_size = part_size
+        self._max_concurrency = max_concurrency
+        self._max_attempts = max_attempts
+        self._max_memory = max_memory
+
+    async def upload_file(self, filename, use_mmap=False, callback=None,
+                          **kwargs):
+        """Upload the file ``filename``.
+
+        :param use_mmap: Upload the parts from a memory map of the file
+            instead of reading them in a thread executor.
+        :param callback: Called with the number of bytes of each part
+            uploaded.
+        :param kwargs: The arguments of the PutObject or
+            CreateMultipartUpload call, e.g. ``Bucket``, ``Key`` and
+            ``ContentType``.
+        :return: The PutObject or CompleteMultipartUpload response.
+        """
+        loop = asyncio.get_event_loop()
+        with open(filename, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if use_mmap and size:
+                with mmap.mmap(f.fileno(), size,
+                               access=mmap.ACCESS_READ) as buffer:
+                    return await self.upload_bytes(
+                        buffer, callback=callback, **kwargs)
+
+            fd = f.fileno()
+            lock = None if hasattr(os, 'pread') else threading.Lock()
+
+            async def read_part(offset, part_size):
+                return await loop.run_in_executor(
+                    None, _read_part, fd, part_size, offset, lock)
+            return await self._upload(size, read_part, callback, kwargs,
+                                      buffers_parts=True)
+
+    async def upload_bytes(self, data, callback=None, **kwargs):
+        """Upload a bytes-like object, e.g. ``bytes``, a ``memoryview`` or
+        an ``mmap``.
+
+        See :meth:`upload_file` for the arguments.
+        """
+        loop = asyncio.get_event_loop()
+        with memoryview(data) as data_view, data_view.cast('B') as view:
+
+            async def read_part(offset, part_size):
+                part = view[offset:offset + part_size]
+                future = loop.run_in_executor(None, _content_md5, part)
+                try:
+                    content_md5 = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # the thread still reads the part, wait for it so that
+                    # the buffer can be released
+                    await asyncio.wait([future])
+                    raise
+                return _BufferReader(part), content_md5
+            return await self._upload(view.nbytes, read_part, callback,
+                                      kwargs, buffers_parts=False)
+
+    def _get_part_size(self, size):
+        part_size = max(self._part_size, _MIN_PART_SIZE,
+                        -(-size // _MAX_PARTS))
+        # round up to a multiple of 1 MiB
+        return -(-part_size // MB) * MB
+
+    async def _upload(self, size, read_part, callback, kwargs,
+                      buffers_parts):
+        if size < self._multipart_threshold:
+            body, content_md5 = await read_part(0, size)
+            try:
+                response = await self._client.put_object(
+                    Body=body, ContentMD5=content_md5, **kwargs)
+            finally:
+                _close_body(body)
+            if callback is not None:
+                callback(size)
+            return response
+
+        part_size = self._get_part_size(size)
+        concurrency = self._max_concurrency
+        if buffers_parts and self._max_memory is not None:
+            concurrency = min(concurrency,
+                              max(1, self._max_memory // part_size))
+
+        upload = await self._client.create_multipart_upload(**kwargs)
+        upload_kwargs = {
+            'Bucket': kwargs['Bucket'], 'Key': kwargs['Key'],
+            'UploadId': upload['UploadId'],
+        }
+        part_kwargs = dict(upload_kwargs, **{
+            name: kwargs[name] for name in _UPLOAD_PART_ARGS if name in kwargs
+        })
+        parts = []
+        part_numbers = iter(range(1, -(-size // part_size) + 1))
+
+        async def upload_parts():
+            for part_number in part_numbers:
+                offset = (part_number - 1) * part_size
+                etag = await self._upload_part(
+                    part_kwargs, part_number, read_part, offset,
+                    min(part_size, size - offset))
+                parts.append({'ETag': etag, 'PartNumber': part_number})
+                if callback is not None:
+                    callback(min(part_size, size - offset))
+
+        tasks = [asyncio.ensure_future(upload_parts())
+                 for _ in range(concurrency)]
+        try:
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            parts.sort(key=lambda part: part['PartNumber'])
+            complete_kwargs = dict(upload_kwargs, **{
+                name: kwargs[name] for name in _COMPLETE_UPLOAD_ARGS
+                if name in kwargs
+            })
+            return await self._client.complete_multipart_upload(
+                MultipartUpload={'Parts': parts}, **complete_kwargs)
+        except BaseException:
+            # shielded so that cancelling the upload still aborts it
+            await asyncio.shield(self._client.abort_multipart_upload(
+                **upload_kwargs))
+            raise
+
+    async def _upload_part(self, part_kwargs, part_number, read_part,
+                           offset, part_size):
+        attempt = 1
+        while True:
+            body, content_md5 = await read_part(offset, part_size)
+            try:
+                response = await self._client.upload_part(
+                    PartNumber=part_number, Body=body,
+                    ContentMD5=content_md5, **part_kwargs)
+                return response['ETag']
+            except _RETRYABLE_UPLOAD_ERRORS:
+                if attempt >= self._max_attempts:
+                    raise
+            finally:
+                _close_body(body)
+            # the part is read again, it is not kept during the backoff
+            del body
+            await asyncio.sleep(random.uniform(0, 0.1 * 2 ** attempt))
+            attempt += 1
+
+
+class S3ObjectReader:
+    """Async file-like object reading an S3 object with ranged GetObject
+    calls.
+
+    The object is read in blocks of ``block_size`` bytes, the last
+    ``max_cached_blocks`` of which are kept.  Concurrent reads of a block
+    share a single request, and once reads are sequential the
+    ``read_ahead`` following blocks are requested in the background.  At
+    most ``max_concurrency`` blocks are requested at a time, e.g. by a
+    large ``read``::
+
+        async with S3ObjectReader(s3_client, Bucket='my-bucket',
+                                  Key='data.parquet') as f:
+            await f.seek(-8, io.SEEK_END)
+            footer = await f.read(8)
+
+    The blocks are requested with the ETag the object had when it was
+    opened as ``IfMatch``, so the reads fail instead of mixing two versions
+    of an object which is overwritten meanwhile.
+
+    :param client: An S3 client.
+    :param block_size: The size of the ranges requested.
+    :param max_cached_blocks: The number of blocks kept.
+    :param read_ahead: The number of blocks requested ahead of sequential
+        reads.
+    :param max_concurrency: The number of blocks requested concurrently.
+    :param kwargs: The arguments of the HeadObject and GetObject calls, e.g.
+        ``Bucket``, ``Key`` and ``VersionId``.
+    """
+
+    def __init__(self, client, block_size=MB, max_cached_blocks=32,
+                 read_ahead=4, max_concurrency=10, **kwargs):
+        self._client = client
+        self._block_size = block_size
+        self._max_cached_blocks = max_cached_blocks
+        self._read_ahead = read_ahead
+        self._max_concurrency = max_concurrency
+        # created on first use, to bind to the running event loop
+        self._semaphore = None
+        self._kwargs = kwargs
+        self._blocks = OrderedDict()
+        self._pending_blocks = {}
+        self._position = 0
+        self._last_read_end = None
+        self.size = None
+        self.head = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def open(self):
+        """Request the size and ETag of the object, the first read does
+        so otherwise."""
+        if self.head is None:
+            self.head = await self._client.head_object(**self._kwargs)
+            self.size = self.head['ContentLength']
+            self._kwargs = dict(self._kwargs, IfMatch=self.head['ETag'])
+
+    async def close(self):
+        """Cancel the requests in progress and drop the cached blocks."""
+        futures = list(self._pending_blocks.values())
+        for future in futures:
+            future.cancel()
+        await asyncio.gather(*futures, return_exceptions=True)
+        self._pending_blocks.clear()
+        self._blocks.clear()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    async def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            await self.open()
+            offset += self.size
+        if offset < 0:
+            raise ValueError('Negative seek position %d' % offset)
+        self._position = offset
+        return offset
+
+    async def read(self, size=-1):
+        """Read at most ``size`` bytes, everything up to the end of the
+        object when ``size`` is negative."""
+        await self.open()
+        start = self._position
+        end = self.size if size < 0 else min(start + size, self.size)
+        if start >= end:
+            return b''
+
+        first_block = start // self._block_size
+        last_block = (end - 1) // self._block_size
+        sequential = start == self._last_read_end
+        blocks = await asyncio.gather(*[
+            self._get_block(index)
+            for index in range(first_block, last_block + 1)
+        ])
+        if sequential:
+            last_block_needed = min(last_block + self._read_ahead,
+                                    (self.size - 1) // self._block_size)
+            for index in range(last_block + 1, last_block_needed + 1):
+                self._fetch_block(index)
+
+        offset = start - first_block * self._block_size
+        if len(blocks) == 1:
+            data = blocks[0][offset:offset + end - start]
+        else:
+            data = b''.join(blocks)[offset:offset + end - start]
+        self._position = self._last_read_end = end
+        return data
+
+    async def _get_block(self, index):
+        block = self._blocks.get(index)
+        if block is not None:
+            self._blocks.move_to_end(index)
+            return block
+        # shielded so a cancelled read doesn't cancel the request for others
+        return await asyncio.shield(self._fetch_block(index))
+
+    def _fetch_block(self, index):
+        future = self._pending_blocks.get(index)
+        if future is None and index not in self._blocks:
+            future = asyncio.ensure_future(self._request_block(index))
+            self._pending_blocks[index] = future
+            future.add_done_callback(
+                lambda f: self._block_fetched(index, f))
+        return future
+
+    def _block_fetched(self, index, future):
+        self._pending_blocks.pop(index, None)
+        if future.cancelled() or future.exception() is not None:
+            # read-ahead failures surface once the block is read
+            return
+        self._blocks[index] = future.result()
+        while len(self._blocks) > self._max_cached_blocks:
+            self._blocks.popitem(last=False)
+
+    async def _request_block(self, index):
+        start = index * self._block_size
+        end = min(start + self._block_size, self.size)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        async with self._semaphore:
+            response = await self._client.get_object(
+                Range='bytes=%d-%d' % (start, end - 1), **self._kwargs)
+            async with response['Body'] as body:
+                return await body.read()
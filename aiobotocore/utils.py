@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import json
+import time
 
 import aiohttp
 import aiohttp.client_exceptions
@@ -17,7 +18,58 @@ logger = logging.getLogger(__name__)
 RETRYABLE_HTTP_ERRORS = (aiohttp.client_exceptions.ClientError, asyncio.TimeoutError)
 
 
-class AioIMDSFetcher(IMDSFetcher):
+class _AioPooledSessionMixin:
+    """Shares one ``aiohttp.ClientSession`` between the requests of a
+    metadata retrieval (e.g. the token, role name and credentials requests)
+    instead of opening a new one, and a new connection, for every request.
+
+    The session is created from the ``self._session`` factory on first use
+    and closed once no retrieval uses it anymore, so nothing is left open
+    between credential refreshes.
+    """
+    _client_session = None
+    _client_session_loop = None
+    _client_session_users = 0
+
+    async def _with_client_session(self, func, *args, **kwargs):
+        self._client_session_users += 1
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self._client_session_users -= 1
+            if not self._client_session_users:
+                await self._close_client_session()
+
+    async def _get_client_session(self, **kwargs):
+        loop = asyncio.get_event_loop()
+        session = self._client_session
+        if session is None or self._client_session_loop is not loop or \
+                getattr(session, 'closed', False):
+            if session is not None:
+                # NOTE: a session can't be used from another event loop, one
+                #       bound to a previous loop is replaced
+                await self._close_client_session()
+            session = self._session(**kwargs)
+            self._client_session = session
+            self._client_session_loop = loop
+        return session
+
+    async def _close_client_session(self):
+        session = self._client_session
+        self._client_session = self._client_session_loop = None
+        if session is not None:
+            try:
+                await session.close()
+            except Exception:
+                # e.g. the session's event loop was closed already
+                logger.debug('Failed to close metadata http session',
+                             exc_info=True)
+
+
+class AioIMDSFetcher(_AioPooledSessionMixin, IMDSFetcher):
+    # Fetch a new token when the cached one expires within this many seconds
+    _TOKEN_REFRESH_MARGIN = 300
+
     class Response(object):
         def __init__(self, status_code, text, url):
             self.status_code = status_code
@@ -25,13 +77,38 @@ class AioIMDSFetcher(IMDSFetcher):
             self.text = text
             self.content = text
 
-    def __init__(self, *args, session=None, **kwargs):
+    def __init__(self, *args, session=None, time_fetcher=time.monotonic,
+                 **kwargs):
         super(AioIMDSFetcher, self).__init__(*args, **kwargs)
         self._trust_env = bool(get_environ_proxies(self._base_url))
         self._session = session or aiohttp.ClientSession
+        self._time_fetcher = time_fetcher
+        self._token = None
+        self._token_expiry_time = None
+
+    async def _get_imds_session(self):
+        return await self._get_client_session(
+            timeout=aiohttp.ClientTimeout(total=self._timeout),
+            trust_env=self._trust_env)
 
     async def _fetch_metadata_token(self):
         self._assert_enabled()
+        if self._token is not None and \
+                self._time_fetcher() < self._token_expiry_time:
+            return self._token
+
+        request_time = self._time_fetcher()
+        token = await self._request_metadata_token()
+        if token is not None:
+            self._token = token
+            self._token_expiry_time = (request_time + int(self._TOKEN_TTL) -
+                                       self._TOKEN_REFRESH_MARGIN)
+        return token
+
+    def _invalidate_metadata_token(self):
+        self._token = self._token_expiry_time = None
+
+    async def _request_metadata_token(self):
         url = self._base_url + self._TOKEN_PATH
         headers = {
             'x-aws-ec2-metadata-token-ttl-seconds': self._TOKEN_TTL,
@@ -41,32 +118,30 @@ class AioIMDSFetcher(IMDSFetcher):
         request = botocore.awsrequest.AWSRequest(
             method='PUT', url=url, headers=headers)
 
-        timeout = aiohttp.ClientTimeout(total=self._timeout)
-        async with self._session(timeout=timeout,
-                                 trust_env=self._trust_env) as session:
-            for i in range(self._num_attempts):
-                try:
-                    async with session.put(url, headers=headers) as resp:
-                        text = await resp.text()
-                        if resp.status == 200:
-                            return text
-                        elif resp.status in (404, 403, 405):
-                            return None
-                        elif resp.status in (400,):
-                            raise BadIMDSRequestError(request)
-                except asyncio.TimeoutError:
-                    return None
-                except RETRYABLE_HTTP_ERRORS as e:
-                    logger.debug(
-                        "Caught retryable HTTP exception while making metadata "
-                        "service request to %s: %s", url, e, exc_info=True)
-                except aiohttp.client_exceptions.ClientConnectorError as e:
-                    if getattr(e, 'errno', None) == 8 or \
-                            str(getattr(e, 'os_error', None)) == \
-                            'Domain name not found':  # threaded vs async resolver
-                        raise InvalidIMDSEndpointError(endpoint=url, error=e)
-                    else:
-                        raise
+        session = await self._get_imds_session()
+        for i in range(self._num_attempts):
+            try:
+                async with session.put(url, headers=headers) as resp:
+                    text = await resp.text()
+                    if resp.status == 200:
+                        return text
+                    elif resp.status in (404, 403, 405):
+                        return None
+                    elif resp.status in (400,):
+                        raise BadIMDSRequestError(request)
+            except asyncio.TimeoutError:
+                return None
+            except RETRYABLE_HTTP_ERRORS as e:
+                logger.debug(
+                    "Caught retryable HTTP exception while making metadata "
+                    "service request to %s: %s", url, e, exc_info=True)
+            except aiohttp.client_exceptions.ClientConnectorError as e:
+                if getattr(e, 'errno', None) == 8 or \
+                        str(getattr(e, 'os_error', None)) == \
+                        'Domain name not found':  # threaded vs async resolver
+                    raise InvalidIMDSEndpointError(endpoint=url, error=e)
+                else:
+                    raise
 
         return None
 
@@ -80,26 +155,31 @@ class AioIMDSFetcher(IMDSFetcher):
             headers['x-aws-ec2-metadata-token'] = token
         self._add_user_agent(headers)
 
-        timeout = aiohttp.ClientTimeout(total=self._timeout)
-        async with self._session(timeout=timeout,
-                                 trust_env=self._trust_env) as session:
-            for i in range(self._num_attempts):
-                try:
-                    async with session.get(url, headers=headers) as resp:
-                        text = await resp.text()
-                        response = self.Response(resp.status, text, resp.url)
-
-                    if not retry_func(response):
-                        return response
-                except RETRYABLE_HTTP_ERRORS as e:
-                    logger.debug(
-                        "Caught retryable HTTP exception while making metadata "
-                        "service request to %s: %s", url, e, exc_info=True)
+        session = await self._get_imds_session()
+        for i in range(self._num_attempts):
+            try:
+                async with session.get(url, headers=headers) as resp:
+                    text = await resp.text()
+                    response = self.Response(resp.status, text, resp.url)
+
+                if response.status_code == 401 and token is not None:
+                    # the token was rejected, fetch a new one next time
+                    self._invalidate_metadata_token()
+                if not retry_func(response):
+                    return response
+            except RETRYABLE_HTTP_ERRORS as e:
+                logger.debug(
+                    "Caught retryable HTTP exception while making metadata "
+                    "service request to %s: %s", url, e, exc_info=True)
         raise self._RETRIES_EXCEEDED_ERROR_CLS()
 
 
 class AioInstanceMetadataFetcher(AioIMDSFetcher, InstanceMetadataFetcher):
     async def retrieve_iam_role_credentials(self):
+        return await self._with_client_session(
+            self._retrieve_iam_role_credentials)
+
+    async def _retrieve_iam_role_credentials(self):
         try:
             token = await self._fetch_metadata_token()
             role_name = await self._get_iam_role(token)
@@ -246,7 +326,8 @@ class AioS3RegionRedirector(S3RegionRedirector):
         return region
 
 
-class AioContainerMetadataFetcher(ContainerMetadataFetcher):
+class AioContainerMetadataFetcher(_AioPooledSessionMixin,
+                                  ContainerMetadataFetcher):
     def __init__(self, session=None, sleep=asyncio.sleep):
         if session is None:
             session = aiohttp.ClientSession
@@ -254,7 +335,8 @@ class AioContainerMetadataFetcher(ContainerMetadataFetcher):
 
     async def retrieve_full_uri(self, full_url, headers=None):
         self._validate_allowed_url(full_url)
-        return await self._retrieve_credentials(full_url, headers)
+        return await self._with_client_session(
+            self._retrieve_credentials, full_url, headers)
 
     async def retrieve_uri(self, relative_uri):
         """Retrieve JSON metadata from ECS metadata.
@@ -266,7 +348,8 @@ class AioContainerMetadataFetcher(ContainerMetadataFetcher):
 
         """
         full_url = self.full_url(relative_uri)
-        return await self._retrieve_credentials(full_url)
+        return await self._with_client_session(
+            self._retrieve_credentials, full_url)
 
     async def _retrieve_credentials(self, full_url, extra_headers=None):
         headers = {'Accept': 'application/json'}
@@ -287,25 +370,25 @@ class AioContainerMetadataFetcher(ContainerMetadataFetcher):
 
     async def _get_response(self, full_url, headers, timeout):
         try:
-            timeout = aiohttp.ClientTimeout(total=self.TIMEOUT_SECONDS)
-            async with self._session(timeout=timeout) as session:
-                async with session.get(full_url, headers=headers) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        raise MetadataRetrievalError(
-                            error_msg=(
-                                          "Received non 200 response (%d) "
-                                          "from ECS metadata: %s"
-                                      ) % (resp.status, text))
-                    try:
-                        return await resp.json()
-                    except ValueError:
-                        text = await resp.text()
-                        error_msg = (
-                            "Unable to parse JSON returned from ECS metadata services"
-                        )
-                        logger.debug('%s:%s', error_msg, text)
-                        raise MetadataRetrievalError(error_msg=error_msg)
+            session = await self._get_client_session(
+                timeout=aiohttp.ClientTimeout(total=self.TIMEOUT_SECONDS))
+            async with session.get(full_url, headers=headers) as resp:
+                if resp.status != 200:
+                    text = await resp.text()
+                    raise MetadataRetrievalError(
+                        error_msg=(
+                                      "Received non 200 response (%d) "
+                                      "from ECS metadata: %s"
+                                  ) % (resp.status, text))
+                try:
+                    return await resp.json()
+                except ValueError:
+                    text = await resp.text()
+                    error_msg = (
+                        "Unable to parse JSON returned from ECS metadata services"
+                    )
+                    logger.debug('%s:%s', error_msg, text)
+                    raise MetadataRetrievalError(error_msg=error_msg)
         except RETRYABLE_HTTP_ERRORS as e:
             error_msg = ("Received error when attempting to retrieve "
                          "ECS metadata: %s" % e)
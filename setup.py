@@ -21,6 +21,7 @@ def read(f):
 extras_require = {
     'awscli': ['awscli==1.18.212'],
     'boto3': ['boto3==1.16.52'],
+    'zstd': ['zstandard'],
 }
 
 
@@ -0,0 +1,108 @@
+"""Startup benchmark.
+
+Measures, each time in a fresh interpreter:
+
+* the time it takes to ``import aiobotocore``, as reported by
+  ``python -X importtime``, along with the slowest modules it imports
+* the time from interpreter start until the first API call against a moto
+  server has returned
+
+Run with::
+
+    $ python -m tests.benchmark_startup --runs 10
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import subprocess
+import sys
+
+from tests.moto_server import MotoService
+
+
+_IMPORTTIME_RE = re.compile(
+    r'^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<name>.*)$')
+
+_FIRST_CALL_SCRIPT = '''
+import time
+start = time.perf_counter()
+import asyncio
+import aiobotocore
+
+
+async def main():
+    session = aiobotocore.get_session()
+    if {snapshot!r}:
+        await session.load_model_snapshot({snapshot!r})
+    async with session.create_client(
+            's3', region_name='us-east-1', endpoint_url={endpoint_url!r},
+            aws_access_key_id='xxx', aws_secret_access_key='xxx') as client:
+        await client.list_buckets()
+
+asyncio.get_event_loop().run_until_complete(main())
+print(time.perf_counter() - start)
+'''
+
+
+def measure_import(runs):
+    totals = []
+    modules = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import aiobotocore'],
+            stderr=subprocess.PIPE, check=True, universal_newlines=True)
+        modules = []
+        for line in result.stderr.splitlines():
+            match = _IMPORTTIME_RE.match(line)
+            if match is None:
+                continue
+            name = match.group('name').strip()
+            modules.append((int(match.group('self')), name))
+            if name == 'aiobotocore':
+                totals.append(int(match.group('cumulative')) / 1e6)
+    return totals, sorted(modules, reverse=True)
+
+
+def measure_first_call(runs, endpoint_url, snapshot):
+    script = _FIRST_CALL_SCRIPT.format(endpoint_url=endpoint_url,
+                                       snapshot=snapshot)
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', script], stdout=subprocess.PIPE,
+            check=True, universal_newlines=True)
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def _report(name, timings):
+    print('{}: median {:.3f}s min {:.3f}s max {:.3f}s ({} runs)'.format(
+        name, statistics.median(timings), min(timings), max(timings),
+        len(timings)))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15,
+                        help='number of slowest imported modules to show')
+    parser.add_argument('--snapshot',
+                        help='model snapshot to load before creating the '
+                             'client, see AioSession.write_model_snapshot')
+    args = parser.parse_args()
+
+    totals, modules = measure_import(args.runs)
+    _report('import aiobotocore', totals)
+    print('slowest modules (self time):')
+    for self_us, name in modules[:args.top]:
+        print('  {:8.1f}ms {}'.format(self_us / 1e3, name.strip()))
+
+    async with MotoService('s3') as server:
+        timings = measure_first_call(
+            args.runs, server.endpoint_url, args.snapshot)
+    _report('time to first call', timings)
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -7,6 +7,7 @@ import asyncio
 from datetime import datetime, timedelta
 import json
 import subprocess
+import threading
 from unittest import TestCase
 from functools import partial
 
@@ -14,10 +15,12 @@ import mock
 from typing import Optional
 
 import pytest
+import botocore.configloader
 import botocore.exceptions
 from botocore.stub import Stubber
 from dateutil.tz import tzlocal, tzutc
 from botocore.utils import datetime2timestamp
+from botocore.credentials import _parse_if_needed
 
 from aiobotocore.session import AioSession
 from aiobotocore import credentials
@@ -170,6 +173,76 @@ async def test_deferrablecredentials_refresh_only_called_once(deferrable_creds):
     assert creds._refresh_using.call_count == 1
 
 
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_background_refresh(deferrable_creds):
+    creds = deferrable_creds()
+
+    creds.start_background_refresh()
+    creds.start_background_refresh()
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    # refreshed right away, the new credentials are valid for a day
+    assert creds._refresh_using.call_count == 1
+    assert not creds.refresh_needed()
+    frozen = await creds.get_frozen_credentials()
+    assert frozen.access_key == 'NEW-ACCESS'
+    assert creds._refresh_using.call_count == 1
+
+    task = creds._background_refresh_task
+    await creds.stop_background_refresh()
+    assert not task.done()
+    await creds.stop_background_refresh()
+    assert task.cancelled()
+    assert creds._background_refresh_task is None
+
+    # unbalanced calls are ignored
+    await creds.stop_background_refresh()
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_background_refresh_failure_retries_later(deferrable_creds):
+    creds = deferrable_creds()
+    creds._refresh_using.side_effect = Exception('boom')
+    creds._background_refresh_retry_interval = 0
+
+    creds.start_background_refresh()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    await creds.stop_background_refresh()
+
+    # the task survived the errors and retried
+    assert creds._refresh_using.call_count > 1
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_background_refresh_short_lived_credentials(deferrable_creds):
+    creds = deferrable_creds()
+
+    def short_lived_metadata():
+        # already inside the 15 minute advisory refresh window
+        expiry_time = datetime.now(tzlocal()) + timedelta(seconds=800)
+        return {
+            'access_key': 'NEW-ACCESS',
+            'secret_key': 'NEW-SECRET',
+            'token': 'NEW-TOKEN',
+            'expiry_time': expiry_time.isoformat(),
+        }
+
+    creds._refresh_using.side_effect = short_lived_metadata
+    creds._background_refresh_retry_interval = 0.1
+
+    creds.start_background_refresh()
+    await asyncio.sleep(0.35)
+    await creds.stop_background_refresh()
+
+    # the task waits between refreshes instead of spinning
+    assert 1 < creds._refresh_using.call_count <= 5
+
+
 # From class TestAssumeRoleCredentialFetcher(BaseEnvVar):
 def assume_role_client_creator(with_response):
     class _Client(object):
@@ -268,6 +341,149 @@ async def test_assumerolefetcher_cache_key_with_role_session_name():
     assert cache[cache_key] == response
 
 
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_assumerolefetcher_file_cache(tmp_path):
+    response = {
+        'Credentials': {
+            'AccessKeyId': 'foo',
+            'SecretAccessKey': 'bar',
+            'SessionToken': 'baz',
+            'Expiration': some_future_time()
+        },
+    }
+    client_creator = assume_role_client_creator(response)
+    client = client_creator.return_value
+    assume_role = client.assume_role
+
+    async def slow_assume_role(*args, **kwargs):
+        await asyncio.sleep(0.1)
+        return await assume_role(*args, **kwargs)
+    client.assume_role = slow_assume_role
+
+    # each fetcher stands for another worker process using the same directory
+    fetchers = [
+        credentials.AioAssumeRoleCredentialFetcher(
+            client_creator, credentials.AioCredentials('a', 'b', 'c'),
+            'myrole', cache=credentials.AioJSONFileCache(str(tmp_path)))
+        for _ in range(3)
+    ]
+    results = await asyncio.gather(*[f.fetch_credentials() for f in fetchers])
+
+    expected = get_expected_creds_from_response(response)
+    expected_expiry = expected.pop('expiry_time')
+    for result in results:
+        # the other workers get the expiration as serialized in the file
+        expiry = _parse_if_needed(result.pop('expiry_time'))
+        assert abs(expiry - _parse_if_needed(expected_expiry)) < \
+            timedelta(seconds=1)
+        assert result == expected
+    assert client._call_count == 1
+
+    cache = credentials.AioJSONFileCache(str(tmp_path))
+    cached = await cache.async_get(fetchers[0]._cache_key)
+    assert cached['Credentials']['AccessKeyId'] == 'foo'
+    assert await cache.async_get('missing') is None
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_file_lock_opens_in_executor(tmp_path):
+    open_threads = []
+    os_open = credentials.os.open
+
+    def tracking_open(*args, **kwargs):
+        open_threads.append(threading.get_ident())
+        return os_open(*args, **kwargs)
+
+    path = str(tmp_path / 'lock')
+    with mock.patch.object(credentials.os, 'open', tracking_open):
+        async with credentials._FileLock(path, timeout=1) as lock:
+            assert lock._fd is not None
+            # a second lock of the file times out
+            async with credentials._FileLock(path, timeout=0.1) as other:
+                assert other._fd is None
+    # the file wasn't opened on the event loop's thread
+    assert len(open_threads) == 2
+    assert threading.get_ident() not in open_threads
+
+
+class _FakeSTSClient:
+    def __init__(self):
+        self._request_signer = mock.Mock(
+            _credentials=credentials.AioCredentials('a', 'b', 'c'))
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+
+    def bind(self, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def assume_role(self, **kwargs):
+        self.calls.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {
+            'Credentials': {
+                'AccessKeyId': kwargs['RoleArn'],
+                'SecretAccessKey': 'bar',
+                'SessionToken': 'baz',
+                'Expiration': some_future_time().isoformat()
+            },
+        }
+
+
+@pytest.mark.moto
+def test_assumerolepool_created_outside_event_loop():
+    # nothing is bound to an event loop until credentials are fetched
+    pool = credentials.AioAssumeRoleCredentialPool(_FakeSTSClient())
+    assert pool._sts_semaphore is None
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_assumerolepool():
+    sts = _FakeSTSClient()
+    pool = credentials.AioAssumeRoleCredentialPool(
+        sts, max_size=3, max_concurrent_calls=2,
+        extra_args={'RoleSessionName': 'fleet'})
+
+    # concurrent users of a role share one AssumeRole call
+    creds = pool.get_credentials('role-0')
+    assert pool.get_credentials('role-0') is creds
+    frozen = await asyncio.gather(
+        *[creds.get_frozen_credentials() for _ in range(5)])
+    assert {f.access_key for f in frozen} == {'role-0'}
+    assert len(sts.calls) == 1
+    assert sts.calls[0]['RoleSessionName'] == 'fleet'
+
+    # the number of concurrent AssumeRole calls is capped
+    await asyncio.gather(*[
+        pool.get_credentials('role-%d' % i).get_frozen_credentials()
+        for i in range(1, 5)])
+    assert len(sts.calls) == 5
+    assert sts.max_in_flight == 2
+
+    # only the most recently used roles are kept
+    assert pool.get_credentials('role-0') is not creds
+
+    client = mock.Mock()
+    bound = pool.bind(client, 'role-4', region_name='eu-west-1')
+    assert bound is client.bind.return_value
+    client.bind.assert_called_once_with(
+        region_name='eu-west-1', credentials=pool.get_credentials('role-4'))
+
+    await pool.close()
+
+
 @pytest.mark.moto
 @pytest.mark.asyncio
 async def test_assumerolefetcher_cache_in_cache_but_expired():
@@ -451,6 +667,64 @@ async def test_credresolver_no_providers(credential_provider):
     assert creds is None
 
 
+def _slow_provider(provider_cls, creds, delay=0.1):
+    provider = mock.Mock(spec=provider_cls)
+    provider.METHOD = provider_cls.METHOD
+    provider.completed = False
+
+    async def load():
+        await asyncio.sleep(delay)
+        provider.completed = True
+        return creds
+    provider.load.side_effect = load
+    return provider
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_credresolver_probe_concurrently(credential_provider):
+    env = credential_provider('env', 'Environment', None)
+    container = _slow_provider(credentials.AioContainerProvider, None)
+    imds = _slow_provider(credentials.AioInstanceMetadataProvider,
+                          credentials.AioCredentials('a', 'b', 'c'))
+    resolver = credentials.AioCredentialResolver(
+        providers=[env, container, imds], probe_concurrently=True)
+
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    creds = await resolver.load_credentials()
+    assert creds.access_key == 'a'
+    # the metadata providers were queried at the same time
+    assert loop.time() - start < 0.19
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_credresolver_probe_concurrently_keeps_precedence(
+        credential_provider):
+    container = _slow_provider(credentials.AioContainerProvider,
+                               credentials.AioCredentials('a', 'b', 'c'))
+    imds = _slow_provider(credentials.AioInstanceMetadataProvider,
+                          credentials.AioCredentials('d', 'e', 'f'),
+                          delay=0)
+    resolver = credentials.AioCredentialResolver(
+        providers=[container, imds], probe_concurrently=True)
+
+    creds = await resolver.load_credentials()
+    assert creds.access_key == 'a'
+
+    env = credential_provider('env', 'Environment',
+                              credentials.AioCredentials('g', 'h', 'i'))
+    container = _slow_provider(credentials.AioContainerProvider, None)
+    resolver = credentials.AioCredentialResolver(
+        providers=[env, container], probe_concurrently=True)
+
+    creds = await resolver.load_credentials()
+    assert creds.access_key == 'g'
+    await asyncio.sleep(0.2)
+    assert not container.completed
+
+
 # From class TestCanonicalNameSourceProvider(BaseEnvVar):
 @pytest.mark.moto
 @pytest.mark.asyncio
@@ -860,6 +1134,34 @@ async def test_sharedcredentials_file_missing():
     assert creds is None
 
 
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_sharedcredentials_file_parsed_once(tmp_path):
+    creds_file = tmp_path / 'credentials'
+    creds_file.write_text(
+        '[default]\naws_access_key_id = foo\naws_secret_access_key = bar\n')
+    parser = mock.Mock(wraps=botocore.configloader.raw_config_parse)
+    cached_parser = credentials._MtimeCachedParser(parser)
+
+    for _ in range(2):
+        provider = credentials.AioSharedCredentialProvider(
+            creds_filename=str(creds_file), ini_parser=cached_parser)
+        creds = await provider.load()
+        assert creds.access_key == 'foo'
+    assert parser.call_count == 1
+
+    # the file is parsed again once it changed
+    creds_file.write_text(
+        '[default]\naws_access_key_id = foo2\naws_secret_access_key = bar\n')
+    creds = await provider.load()
+    assert creds.access_key == 'foo2'
+    assert parser.call_count == 2
+
+    provider = credentials.AioSharedCredentialProvider(
+        creds_filename=str(tmp_path / 'missing'), ini_parser=cached_parser)
+    assert await provider.load() is None
+
+
 # From class TestBotoProvider(BaseEnvVar):
 @pytest.mark.moto
 @pytest.mark.asyncio
@@ -4,11 +4,14 @@ import pytest
 import mock
 
 import aiobotocore
+import aiobotocore.auth
+import aiobotocore.config
 import aiobotocore.credentials
 import aiobotocore.signers
 import botocore.auth
 from botocore.model import ServiceId
 from botocore.awsrequest import AWSRequest
+from botocore.credentials import ReadOnlyCredentials
 from botocore.exceptions import UnknownClientMethodError, NoRegionError, \
     UnknownSignatureVersionError
 
@@ -260,3 +263,131 @@ async def test_signers_generate_db_auth_token(rds_client):
         'prod-instance.us-east-1.rds.amazonaws.com:3306/?AWSAccessKeyId=xxx&')
     assert result2.startswith(
         'prod-instance.us-east-1.rds.amazonaws.com:3306/?AWSAccessKeyId=xxx&')
+
+
+@pytest.mark.moto
+@pytest.mark.parametrize('auth_cls', [
+    botocore.auth.SigV4Auth, botocore.auth.S3SigV4Auth,
+    botocore.auth.SigV4QueryAuth, botocore.auth.S3SigV4QueryAuth])
+def test_fast_auth_class_matches_botocore(auth_cls):
+    credentials = ReadOnlyCredentials('key', 'secret', 'token')
+    fast_cls = aiobotocore.auth.get_fast_auth_class(auth_cls)
+    assert issubclass(fast_cls, auth_cls)
+
+    def make_request():
+        request = AWSRequest(
+            method='GET', url='https://bucket.s3.amazonaws.com/key?b=2&a=1',
+            headers={'X-Amz-Meta-Foo': ' a   b ', 'Content-Type': 'text/plain'})
+        request.headers.add_header('X-Amz-Meta-Foo', 'c')
+        return request
+
+    signed = []
+    with mock.patch('botocore.auth.datetime') as mock_datetime:
+        mock_datetime.datetime.utcnow.return_value = \
+            datetime.datetime(2021, 1, 1, 12)
+        for cls in (auth_cls, fast_cls, fast_cls):
+            request = make_request()
+            cls(credentials, 's3', 'us-west-2').add_auth(request)
+            signed.append((request.url, dict(request.headers)))
+
+    assert signed[0] == signed[1] == signed[2]
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_signer_reuses_auth_instance(base_signer_setup: dict):
+    signer = base_signer_setup['signer']
+    auth = await signer.get_auth_instance('signing_name', 'region_name')
+    assert isinstance(auth, botocore.auth.SigV4Auth)
+    assert await signer.get_auth_instance(
+        'signing_name', 'region_name') is auth
+    assert await signer.get_auth_instance(
+        'signing_name', 'other_region') is not auth
+
+
+@pytest.mark.moto
+def test_presigned_url_cache_expiry_and_eviction():
+    now = 0
+
+    cache = aiobotocore.signers.PresignedUrlCache(
+        max_size=2, min_remaining_ratio=0.25, time_fetcher=lambda: now)
+    cache.put('a', 'url-a', 100)
+    cache.put('b', 'url-b', 100)
+    assert cache.get('a') == 'url-a'
+
+    # 'b' is the least recently used one
+    cache.put('c', 'url-c', 100)
+    assert cache.get('b') is None
+    assert len(cache) == 2
+
+    now = 75
+    assert cache.get('a') == 'url-a'
+    now = 76
+    assert cache.get('a') is None
+    assert len(cache) == 1
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_presigned_url_cache_reuses_urls():
+    cache = aiobotocore.signers.PresignedUrlCache()
+    session = aiobotocore.session.get_session()
+    config = aiobotocore.config.AioConfig(presign_cache=cache)
+    async with session.create_client('rds', region_name='us-east-1',
+                                     aws_access_key_id='lalala',
+                                     aws_secret_access_key='lalala',
+                                     config=config) as client:
+        token = await client.generate_db_auth_token(
+            'prod-instance.us-east-1.rds.amazonaws.com', 3306, 'someusername')
+        assert await client.generate_db_auth_token(
+            'prod-instance.us-east-1.rds.amazonaws.com', 3306,
+            'someusername') is token
+        assert await client.generate_db_auth_token(
+            'prod-instance.us-east-1.rds.amazonaws.com', 3306,
+            'otheruser') != token
+
+    async with session.create_client('s3', region_name='us-east-1',
+                                     aws_access_key_id='lalala',
+                                     aws_secret_access_key='lalala',
+                                     config=config) as client:
+        params = {'Bucket': 'mybucket', 'Key': 'mykey'}
+        url = await client.generate_presigned_url('get_object', Params=params)
+        assert await client.generate_presigned_url(
+            'get_object', Params=params) is url
+        assert await client.generate_presigned_url(
+            'get_object', Params=params, ExpiresIn=60) != url
+
+        # other credentials must not get the cached url
+        bound = client.bind(aws_access_key_id='other',
+                            aws_secret_access_key='other')
+        assert await bound.generate_presigned_url(
+            'get_object', Params=params) != url
+    assert len(cache) == 5
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_presigned_url_cache_shared_between_clients():
+    cache = aiobotocore.signers.PresignedUrlCache()
+    session = aiobotocore.session.get_session()
+    params = {'Bucket': 'mybucket', 'Key': 'mykey'}
+    urls = []
+    for config in (
+            aiobotocore.config.AioConfig(signature_version='s3v4'),
+            aiobotocore.config.AioConfig(signature_version='s3'),
+            aiobotocore.config.AioConfig(signature_version='s3v4',
+                                         s3={'addressing_style': 'path'})):
+        config = config.merge(
+            aiobotocore.config.AioConfig(presign_cache=cache))
+        async with session.create_client('s3', region_name='us-east-1',
+                                         aws_access_key_id='lalala',
+                                         aws_secret_access_key='lalala',
+                                         config=config) as client:
+            urls.append(await client.generate_presigned_url(
+                'get_object', Params=params))
+
+    # the clients' urls differ, none got another client's cached url
+    assert 'X-Amz-Signature' in urls[0]
+    assert 'X-Amz-Signature' not in urls[1]
+    assert '/mybucket/mykey' in urls[2]
+    assert len(set(urls)) == len(cache) == 3
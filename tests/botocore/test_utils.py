@@ -46,8 +46,12 @@ def fake_aiohttp_session(responses: Union[List[Tuple[Union[str, object], int]],
             async def json(self):
                 return json.loads(self._body)
 
+        instances = []
+
         def __init__(self, *args, **kwargs):
-            pass
+            self.closed = False
+            self.requests = []
+            self.instances.append(self)
 
         async def __aenter__(self):
             return self
@@ -55,10 +59,15 @@ def fake_aiohttp_session(responses: Union[List[Tuple[Union[str, object], int]],
         async def __aexit__(self, exc_type, exc_val, exc_tb):
             pass
 
+        async def close(self):
+            self.closed = True
+
         def get(self, url, *args, **kwargs):
+            self.requests.append(('GET', url))
             return self.FakeResponse(url)
 
         def put(self, url, *args, **kwargs):
+            self.requests.append(('PUT', url))
             return self.FakeResponse(url)
 
     return FakeAioHttpSession
@@ -103,6 +112,8 @@ async def test_containermetadatafetcher_retrieve_url_bad_status():
     fetcher = utils.AioContainerMetadataFetcher(http, sleep)
     with pytest.raises(MetadataRetrievalError):
         await fetcher.retrieve_uri('/foo?id=1')
+    # the session isn't kept once the retries are exhausted
+    assert all(session.closed for session in http.instances)
 
 
 @pytest.mark.moto
@@ -118,6 +129,104 @@ async def test_containermetadatafetcher_retrieve_url_not_json():
         await fetcher.retrieve_uri('/foo?id=1')
 
 
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_containermetadatafetcher_closes_session():
+    json_body = json.dumps({
+        "AccessKeyId": "a",
+        "SecretAccessKey": "b",
+        "Token": "c",
+        "Expiration": "d"
+    })
+
+    http = fake_aiohttp_session([("not json", 200), (json_body, 200)])
+    fetcher = utils.AioContainerMetadataFetcher(http, mock.AsyncMock())
+    await fetcher.retrieve_uri('/foo?id=1')
+
+    # the retry re-used the session, which was closed afterwards
+    session, = http.instances
+    assert len(session.requests) == 2
+    assert session.closed
+    assert fetcher._client_session is None
+    await fetcher._close_client_session()
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_instancemetadatafetcher_caches_token():
+    creds = json.dumps({
+        'AccessKeyId': 'spam',
+        'SecretAccessKey': 'eggs',
+        'Token': 'spam-token',
+        'Expiration': 'something',
+    })
+    http = fake_aiohttp_session([
+        ('token', 200), ('role-name', 200), (creds, 200),
+        ('role-name', 200), (creds, 200),
+        ('token2', 200), ('role-name', 200), (creds, 200),
+    ])
+    now = mock.Mock(return_value=0)
+    fetcher = AioInstanceMetadataFetcher(session=http, time_fetcher=now)
+
+    for _ in range(2):
+        result = await fetcher.retrieve_iam_role_credentials()
+        assert result['access_key'] == 'spam'
+
+    # the token is fetched again once it is about to expire
+    now.return_value = int(fetcher._TOKEN_TTL)
+    await fetcher.retrieve_iam_role_credentials()
+    assert fetcher._token == 'token2'
+
+    # one session per retrieval, closed once it is done
+    assert [[method for method, _ in session.requests]
+            for session in http.instances] == [
+        ['PUT', 'GET', 'GET'], ['GET', 'GET'], ['PUT', 'GET', 'GET']]
+    assert all(session.closed for session in http.instances)
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_instancemetadatafetcher_closes_session_on_cancel():
+    started = asyncio.Event()
+
+    class HangingSession(fake_aiohttp_session(('token', 200))):
+        def get(self, url, *args, **kwargs):
+            started.set()
+            return self.HangingResponse()
+
+        class HangingResponse:
+            async def __aenter__(self):
+                await asyncio.sleep(60)
+
+            async def __aexit__(self, exc_type, exc_val, exc_tb):
+                pass
+
+    fetcher = AioInstanceMetadataFetcher(session=HangingSession)
+    task = asyncio.ensure_future(fetcher.retrieve_iam_role_credentials())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    session, = HangingSession.instances
+    assert session.closed
+    assert fetcher._client_session is None
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_pooled_session_replaced_on_new_loop():
+    http = fake_aiohttp_session(('token', 200))
+    fetcher = AioInstanceMetadataFetcher(session=http)
+    session = await fetcher._get_imds_session()
+    fetcher._client_session_loop = object()
+
+    # a session of another event loop is closed before it is replaced
+    assert await fetcher._get_imds_session() is not session
+    assert session.closed
+    await fetcher._close_client_session()
+
+
 class TestInstanceMetadataFetcher(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
         urllib3_session_send = 'aiohttp.ClientSession._request'
@@ -4,6 +4,13 @@ from collections import defaultdict
 import pytest
 import aiohttp
 import aioitertools
+import jmespath
+from botocore.exceptions import PaginationError
+
+from aiobotocore.config import AioConfig
+from aiobotocore.paginate import ParallelListObjectsIterator, \
+    _FanOutResultKeyIterator, _ResultKeyFanOut
+from aiobotocore.response import DrainPolicy
 
 
 async def fetch_all(pages):
@@ -72,6 +79,18 @@ async def test_can_delete_urlencoded_object(s3_client, bucket_name,
     pytest.aio.assert_status_code(response, 204)
 
 
+@pytest.mark.asyncio
+@pytest.mark.moto
+async def test_get_object_checksum(s3_client, bucket_name, create_object):
+    await create_object('key', body='some data')
+    response = await s3_client.get_object(Bucket=bucket_name, Key='key')
+    async with response['Body'] as stream:
+        # verified against the ETag
+        stream.set_checksum('md5')
+        assert await stream.read() == b'some data'
+    assert stream.checksum == 'HlAhCgICSX+3m8OLat5sNA=='
+
+
 @pytest.mark.asyncio
 @pytest.mark.moto
 async def test_can_paginate(s3_client, bucket_name, create_object):
@@ -123,6 +142,41 @@ async def test_can_search_paginate(
         assert key_name in keys
 
 
+@pytest.mark.asyncio
+@pytest.mark.moto
+@pytest.mark.parametrize('operation', ['list_objects', 'list_objects_v2'])
+async def test_can_search_paginate_projected(
+        s3_client, bucket_name, create_object, operation):
+    keys = ['a b', 'a+b/c', 'key0', 'key1', 'key2']
+    for key_name in keys:
+        await create_object(key_name)
+
+    parsed_pages = []
+
+    def capture(parsed, **kwargs):
+        parsed_pages.append(parsed)
+
+    s3_client.meta.events.register('after-call.s3', capture)
+
+    paginator = s3_client.get_paginator(operation)
+    page_iter = paginator.paginate(Bucket=bucket_name, MaxKeys=2)
+    results = [key_name async for key_name in
+               page_iter.search('Contents[*].Key', project=True)]
+    assert results == keys
+    assert len(parsed_pages) == 3
+    for parsed in parsed_pages:
+        for item in parsed['Contents']:
+            assert list(item) == ['Key']
+
+    parsed_pages.clear()
+    page_iter = paginator.paginate(Bucket=bucket_name, MaxKeys=2)
+    results = [size async for size in
+               page_iter.search('Contents[].Size', project=True)]
+    assert len(results) == len(keys)
+    assert all('LastModified' not in item
+               for parsed in parsed_pages for item in parsed['Contents'])
+
+
 @pytest.mark.asyncio
 @pytest.mark.moto
 async def test_can_paginate_iterator(s3_client, bucket_name, create_object):
@@ -142,6 +196,114 @@ async def test_can_paginate_iterator(s3_client, bucket_name, create_object):
     assert key_names == ['key0', 'key1', 'key2', 'key3', 'key4']
 
 
+@pytest.mark.asyncio
+@pytest.mark.moto
+async def test_can_paginate_with_prefetch(
+        s3_client, bucket_name, create_object):
+    for i in range(5):
+        key_name = 'key%s' % i
+        await create_object(key_name)
+
+    paginator = s3_client.get_paginator('list_objects')
+    key_names = []
+    async for page in paginator.paginate(prefetch=2, MaxKeys=1,
+                                         Bucket=bucket_name):
+        # give the prefetching task time to run ahead
+        await asyncio.sleep(0.05)
+        key_names.append(page['Contents'][0]['Key'])
+    assert key_names == ['key0', 'key1', 'key2', 'key3', 'key4']
+
+    pages = paginator.paginate(
+        prefetch=2, PaginationConfig={'MaxItems': 3, 'PageSize': 2},
+        Bucket=bucket_name)
+    result = await pages.build_full_result()
+    assert [c['Key'] for c in result['Contents']] == ['key0', 'key1', 'key2']
+    assert 'NextToken' in result
+
+    # stopping early cancels the requests made ahead
+    async for page in paginator.paginate(prefetch=2, MaxKeys=1,
+                                         Bucket=bucket_name):
+        break
+
+
+@pytest.mark.asyncio
+@pytest.mark.moto
+async def test_paginate_prefetch_bound(s3_client, bucket_name, create_object):
+    for i in range(6):
+        await create_object('key%s' % i)
+
+    requests = []
+
+    def count_request(**kwargs):
+        requests.append(kwargs)
+
+    s3_client.meta.events.register('before-call.s3.ListObjects',
+                                   count_request)
+    paginator = s3_client.get_paginator('list_objects')
+    consumed = 0
+    async for page in paginator.paginate(prefetch=2, MaxKeys=1,
+                                         Bucket=bucket_name):
+        consumed += 1
+        # give the prefetching task time to run ahead
+        await asyncio.sleep(0.05)
+        # at most 2 pages beyond the ones consumed were requested
+        assert len(requests) <= consumed + 2
+    assert consumed == 6
+
+
+@pytest.mark.asyncio
+@pytest.mark.moto
+async def test_parallel_list_objects(s3_client, bucket_name, create_object):
+    keys = ['a.txt', 'b/1', 'b/2', 'b/3', 'b0', 'c/1', 'c/d/2', 'e']
+    for key in keys:
+        await create_object(key)
+
+    paginator = s3_client.get_paginator('list_objects_v2')
+    objects = ParallelListObjectsIterator(
+        paginator, max_concurrency=2, Bucket=bucket_name, MaxKeys=1)
+    found = [obj['Key'] async for obj in objects]
+    assert sorted(found) == keys
+
+    objects = ParallelListObjectsIterator(
+        paginator, max_concurrency=2, sort=True, Bucket=bucket_name,
+        MaxKeys=1)
+    assert [obj['Key'] async for obj in objects] == keys
+
+    objects = ParallelListObjectsIterator(
+        paginator, partitions=['b/2', 'c/1'], sort=True, Bucket=bucket_name,
+        MaxKeys=2)
+    assert [obj['Key'] async for obj in objects] == keys
+
+    objects = ParallelListObjectsIterator(
+        paginator, partitions=['b/2'], Bucket=bucket_name, Prefix='b/')
+    assert sorted([obj['Key'] async for obj in objects]) == \
+        ['b/1', 'b/2', 'b/3']
+
+    objects = ParallelListObjectsIterator(
+        paginator, max_concurrency=1, Bucket=bucket_name, MaxKeys=1)
+    assert sorted([obj['Key'] async for obj in objects]) == keys
+
+    # the top level listing is split as its pages arrive
+    top_level_requests = []
+
+    def capture(params, **kwargs):
+        if 'Delimiter' in params:
+            top_level_requests.append(params)
+
+    s3_client.meta.events.register(
+        'before-parameter-build.s3.ListObjectsV2', capture)
+    objects = ParallelListObjectsIterator(
+        paginator, max_concurrency=1, sort=True, Bucket=bucket_name,
+        MaxKeys=1).__aiter__()
+    assert (await objects.__anext__())['Key'] == 'a.txt'
+    await objects.aclose()
+    assert len(top_level_requests) == 1
+
+    with pytest.raises(ValueError):
+        ParallelListObjectsIterator(paginator, Bucket=bucket_name,
+                                    Delimiter='/')
+
+
 @pytest.mark.asyncio
 @pytest.mark.moto
 async def test_result_key_iters(s3_client, bucket_name, create_object):
@@ -174,6 +336,103 @@ async def test_result_key_iters(s3_client, bucket_name, create_object):
     assert 'CommonPrefixes' in response
 
 
+@pytest.mark.asyncio
+@pytest.mark.moto
+async def test_result_key_iters_fan_out(s3_client, bucket_name, create_object):
+    for i in range(5):
+        await create_object('key/%s/%s' % (i, i))
+        await create_object('key/%s' % i)
+
+    paginator = s3_client.get_paginator('list_objects')
+    expected_keys = []
+    expected_prefixes = []
+    async for page in paginator.paginate(
+            MaxKeys=2, Prefix='key/', Delimiter='/', Bucket=bucket_name):
+        expected_keys.extend(c['Key'] for c in page['Contents'])
+        expected_prefixes.extend(p['Prefix'] for p in page['CommonPrefixes'])
+    assert len(expected_keys) == 5
+
+    async def collect(iterator):
+        return [value async for value in iterator]
+
+    # one iterator consumed before the other
+    pages = paginator.paginate(MaxKeys=2, Prefix='key/', Delimiter='/',
+                               Bucket=bucket_name)
+    contents, prefixes = pages.result_key_iters()
+    assert [c['Key'] for c in await collect(contents)] == expected_keys
+    assert [p['Prefix'] for p in await collect(prefixes)] == \
+        expected_prefixes
+
+    # bounded buffers, consumed concurrently
+    pages = paginator.paginate(MaxKeys=2, Prefix='key/', Delimiter='/',
+                               Bucket=bucket_name)
+    contents, prefixes = pages.result_key_iters(max_buffered_pages=1)
+    contents, prefixes = await asyncio.gather(
+        collect(contents), collect(prefixes))
+    assert [c['Key'] for c in contents] == expected_keys
+    assert [p['Prefix'] for p in prefixes] == expected_prefixes
+
+    pages = paginator.paginate(MaxKeys=2, Prefix='key/', Delimiter='/',
+                               Bucket=bucket_name)
+    result = await pages.build_full_result()
+    assert [c['Key'] for c in result['Contents']] == expected_keys
+    assert [p['Prefix'] for p in result['CommonPrefixes']] == \
+        expected_prefixes
+
+
+@pytest.mark.asyncio
+async def test_result_key_fan_out_cancelled_iterator():
+    async def pages():
+        for i in range(3):
+            yield {'A': [i], 'B': [i]}
+
+    fan_out = _ResultKeyFanOut(
+        pages(), [jmespath.compile('A'), jmespath.compile('B')],
+        max_buffered_pages=1)
+    assert await fan_out.get_results(0) == [0]
+    # A is a page ahead of B, it waits for B to consume one
+    waiter = asyncio.ensure_future(fan_out.get_results(0))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    async def collect(index):
+        results = []
+        while True:
+            page = await fan_out.get_results(index)
+            if page is None:
+                return results
+            results.extend(page)
+
+    assert await asyncio.gather(collect(0), collect(1)) == [[1, 2], [0, 1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_result_key_fan_out_sequential_iterators():
+    async def pages():
+        for i in range(40):
+            yield {'A': [i], 'B': [i]}
+
+    async def collect(iterator):
+        return [value async for value in iterator]
+
+    result_keys = [jmespath.compile('A'), jmespath.compile('B')]
+    fan_out = _ResultKeyFanOut(pages(), result_keys)
+    iterators = [_FanOutResultKeyIterator(fan_out, i, result_key)
+                 for i, result_key in enumerate(result_keys)]
+    # unbounded by default, the iterators can be consumed one by one
+    assert await collect(iterators[0]) == list(range(40))
+    assert await collect(iterators[1]) == list(range(40))
+
+    fan_out = _ResultKeyFanOut(pages(), result_keys, max_buffered_pages=32)
+    iterators = [_FanOutResultKeyIterator(fan_out, i, result_key)
+                 for i, result_key in enumerate(result_keys)]
+    # raises instead of waiting for an iterator which isn't consumed
+    with pytest.raises(PaginationError):
+        await collect(iterators[0])
+
+
 @pytest.mark.moto
 @pytest.mark.asyncio
 async def test_can_get_and_put_object(s3_client, create_object, bucket_name):
@@ -512,3 +771,98 @@ async def test_head_object_keys(s3_client, create_object, bucket_name):
     assert set(resp.keys()) == {
         'ETag', 'ContentType', 'Metadata', 'LastModified',
         'ResponseMetadata', 'ContentLength', 'VersionId'}
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_bound_client_signs_with_own_credentials(s3_client, bucket_name):
+    auth_headers = []
+
+    def capture(request, **kwargs):
+        auth = request.headers['Authorization']
+        if isinstance(auth, bytes):
+            auth = auth.decode('utf-8')
+        auth_headers.append(auth)
+
+    s3_client.meta.events.register('before-send.s3.HeadBucket', capture)
+
+    bound = s3_client.bind(aws_access_key_id='tenant',
+                           aws_secret_access_key='secret',
+                           region_name='us-west-2')
+    assert bound.meta.region_name == 'us-west-2'
+    assert bound._endpoint is s3_client._endpoint
+
+    await bound.head_bucket(Bucket=bucket_name)
+    await s3_client.head_bucket(Bucket=bucket_name)
+    assert 'tenant' in auth_headers[0]
+    assert 'tenant' not in auth_headers[1]
+
+    # the view doesn't own the connection pool
+    await bound.close()
+    assert not s3_client._endpoint.http_session.closed
+
+
+@pytest.mark.parametrize('signature_version', ['s3v4'])
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_generate_presigned_urls(s3_client, bucket_name, create_object):
+    keys = ['key-%d' % i for i in range(5)]
+    for key in keys:
+        await create_object(key_name=key, body=key)
+
+    async def params_iter():
+        for key in keys:
+            yield {'Bucket': bucket_name, 'Key': key}
+
+    urls = []
+    async for url in s3_client.generate_presigned_urls(
+            'get_object', params_iter(), ExpiresIn=60):
+        urls.append(url)
+
+    assert len(urls) == len(keys)
+    async with aiohttp.ClientSession() as session:
+        for key, url in zip(keys, urls):
+            assert 'X-Amz-Expires=60' in url
+            async with session.get(url) as resp:
+                assert resp.status == 200
+                assert await resp.read() == key.encode()
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_drain_policy(session, region, config, s3_server, bucket_name,
+                            create_object):
+    await create_object('small', body=b'a' * 100)
+    await create_object('medium', body=b'a' * 1024 * 1024)
+    await create_object('large', body=b'a' * 8 * 1024 * 1024)
+
+    policy = DrainPolicy(max_drain_size=2 * 1024 * 1024)
+    config = config.merge(AioConfig(drain_policy=policy))
+    async with session.create_client(
+            's3', region_name=region, config=config, endpoint_url=s3_server,
+            aws_secret_access_key='xxx', aws_access_key_id='xxx') as client:
+        async def read_one_byte(key):
+            response = await client.get_object(Bucket=bucket_name, Key=key)
+            async with response['Body'] as stream:
+                assert await stream.read(1) == b'a'
+
+        response = await client.get_object(Bucket=bucket_name, Key='small')
+        async with response['Body'] as stream:
+            await stream.read()
+        assert policy.stats == {'released': 1}
+
+        await read_one_byte('medium')
+        assert policy.stats == {'released': 1, 'drained': 1}
+
+        await read_one_byte('large')
+        assert policy.stats == {'released': 1, 'drained': 1, 'closed': 1}
+
+        # closing the body drains it in a task
+        response = await client.get_object(Bucket=bucket_name, Key='medium')
+        await response['Body'].read(1)
+        response['Body'].close()
+        for _ in range(100):
+            if policy.stats['drained'] == 2:
+                break
+            await asyncio.sleep(0.05)
+        assert policy.stats['drained'] == 2
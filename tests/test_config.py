@@ -1,7 +1,10 @@
 import asyncio
+import mock
 from mock_server import AIOServer
 from aiobotocore.session import AioSession, get_session
 from aiobotocore.config import AioConfig
+from aiobotocore.credentials import AioDeferredRefreshableCredentials
+from aiobotocore.response import DrainPolicy
 from botocore.config import Config
 from botocore.exceptions import ParamValidationError, ReadTimeoutError
 import pytest
@@ -44,6 +47,56 @@ def test_connector_args():
     assert aio_cfg.connector_args['keepalive_timeout'] == 75
 
 
+# NOTE: this doesn't require moto but needs to be marked to run with coverage
+@pytest.mark.moto
+def test_presign_cache_merge():
+    cache = object()
+    aio_cfg = AioConfig(presign_cache=cache)
+    assert aio_cfg.merge(Config(read_timeout=75)).presign_cache is cache
+    assert AioConfig().merge(aio_cfg).presign_cache is cache
+
+    other_cache = object()
+    assert aio_cfg.merge(
+        AioConfig(presign_cache=other_cache)).presign_cache is other_cache
+
+
+# NOTE: this doesn't require moto but needs to be marked to run with coverage
+@pytest.mark.moto
+def test_drain_policy_merge():
+    policy = DrainPolicy()
+    aio_cfg = AioConfig(drain_policy=policy)
+    assert aio_cfg.merge(Config(read_timeout=75)).drain_policy is policy
+    assert AioConfig().merge(aio_cfg).drain_policy is policy
+
+    other_policy = DrainPolicy()
+    assert aio_cfg.merge(
+        AioConfig(drain_policy=other_policy)).drain_policy is other_policy
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_background_credential_refresh():
+    session = AioSession()
+    refresher = mock.AsyncMock(return_value={
+        'access_key': 'akid', 'secret_key': 'skid', 'token': 'token',
+        'expiry_time': '2100-01-01T00:00:00Z',
+    })
+    creds = AioDeferredRefreshableCredentials(refresher, 'test')
+    session._credentials = creds
+
+    config = AioConfig(refresh_credentials_in_background=True)
+    async with session.create_client(
+            's3', region_name='us-east-1', config=config) as client:
+        assert client.meta.config.refresh_credentials_in_background
+        assert creds._background_refresh_task is not None
+        await asyncio.sleep(0)
+        assert refresher.call_count == 1
+    assert creds._background_refresh_task is None
+
+    async with session.create_client('s3', region_name='us-east-1'):
+        assert creds._background_refresh_task is None
+
+
 @pytest.mark.moto
 @pytest.mark.asyncio
 async def test_connector_timeout():
@@ -2,6 +2,7 @@ import asyncio
 import uuid
 import pytest
 
+from aiobotocore.paginate import ParallelScanIterator
 from aiobotocore.waiter import WaiterError
 
 
@@ -101,6 +102,57 @@ async def test_batch_write_scan(dynamodb_client, table_name):
     assert test_keys == ['key1', 'key3']
 
 
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_parallel_scan(dynamodb_client):
+    keys = ['key%02d' % i for i in range(20)]
+    calls = []
+
+    # NOTE: moto doesn't implement segmented scans
+    async def scan(TableName, Segment, TotalSegments, Limit,
+                   ExclusiveStartKey=None):
+        calls.append(Segment)
+        await asyncio.sleep(0)
+        segment = keys[Segment::TotalSegments]
+        start = 0
+        if ExclusiveStartKey is not None:
+            start = segment.index(ExclusiveStartKey['testKey']['S']) + 1
+        page = segment[start:start + Limit]
+        response = {'Items': [{'testKey': {'S': key}} for key in page]}
+        if start + Limit < len(segment):
+            response['LastEvaluatedKey'] = {'testKey': {'S': page[-1]}}
+        return response
+
+    paginator = dynamodb_client.get_paginator('scan')
+    paginator._method = scan
+
+    scan_iter = ParallelScanIterator(
+        paginator, 4, max_concurrency=2, TableName='table', Limit=2)
+    found = [item['testKey']['S'] async for item in scan_iter]
+    assert sorted(found) == keys
+    assert sorted(set(calls)) == [0, 1, 2, 3]
+    assert scan_iter.resume_tokens == {0: None, 1: None, 2: None, 3: None}
+
+    # stop half way and resume from where the scan was
+    scan_iter = ParallelScanIterator(
+        paginator, 4, max_concurrency=2, TableName='table', Limit=2)
+    found = []
+    async for item in scan_iter:
+        found.append(item['testKey']['S'])
+        if len(found) == 7:
+            break
+    assert any(scan_iter.resume_tokens.values())
+
+    calls.clear()
+    resumed = ParallelScanIterator(
+        paginator, 4, starting_tokens=scan_iter.resume_tokens,
+        TableName='table', Limit=2)
+    found.extend([item['testKey']['S'] async for item in resumed])
+    # some items may be returned twice, none are skipped
+    assert sorted(set(found)) == keys
+    assert len(calls) < 4 * 3
+
+
 @pytest.mark.moto
 @pytest.mark.parametrize('signature_version', ['v4'])
 @pytest.mark.asyncio
@@ -12,6 +12,7 @@ import aiohttp
 from aiohttp.client import ClientResponse
 import botocore
 from botocore.args import ClientArgsCreator
+from botocore.auth import SigV4Auth
 from botocore.client import ClientCreator, BaseClient, Config
 from botocore.endpoint import convert_to_response_dict, Endpoint, \
     EndpointCreator
@@ -27,8 +28,9 @@ from botocore.signers import RequestSigner, add_generate_presigned_url, \
     generate_presigned_url, S3PostPresigner, add_generate_presigned_post, \
     generate_presigned_post, generate_db_auth_token, add_generate_db_auth_token
 from botocore.hooks import EventAliaser, HierarchicalEmitter
+from botocore.loaders import create_loader, instance_cache
 from botocore.utils import ContainerMetadataFetcher, IMDSFetcher, \
-    InstanceMetadataFetcher, S3RegionRedirector
+    InstanceMetadataFetcher, S3RegionRedirector, CachedProperty
 from botocore.credentials import Credentials, RefreshableCredentials, \
     CachedCredentialFetcher, AssumeRoleCredentialFetcher, EnvProvider, \
     ContainerProvider, InstanceMetadataProvider, ProfileProviderBuilder, \
@@ -36,7 +38,8 @@ from botocore.credentials import Credentials, RefreshableCredentials, \
     AssumeRoleWithWebIdentityProvider, AssumeRoleProvider, \
     CanonicalNameCredentialSourcer, BotoProvider, OriginalEC2Provider, \
     create_credential_resolver, get_credentials, create_mfa_serial_refresher, \
-    AssumeRoleWithWebIdentityCredentialFetcher, SSOCredentialFetcher, SSOProvider
+    AssumeRoleWithWebIdentityCredentialFetcher, SSOCredentialFetcher, SSOProvider, \
+    JSONFileCache
 
 # This file ensures that our private patches will work going forward.  If a
 # method gets updated this will assert and someone will need to validate:
@@ -72,6 +75,12 @@ _AIOHTTP_DIGESTS = {
 
 # If you're changing these, most likely need to update setup.py as well.
 _API_DIGESTS = {
+    # auth.py
+    SigV4Auth.headers_to_sign: {'bef3fca8c5ae27ef019f05db751b6fe2bebeeaed'},
+    SigV4Auth.canonical_headers: {'01338fc67ff25d6ea35d78941190f626ebc43034'},
+    SigV4Auth.signed_headers: {'fd46e25b4f27cfc46217f7e3e453cc0fa7fa4cf1'},
+    SigV4Auth.signature: {'ccb8225cc7f3981b2ebfa07746f8540c6cc321a8'},
+
     # args.py
     ClientArgsCreator.get_client_args: {'e3a44e6f50159e8e31c3d76f5e8a1110dda495fa'},
 
@@ -80,6 +89,7 @@ _API_DIGESTS = {
     ClientCreator._create_client_class: {'5e493d069eedbf314e40e12a7886bbdbcf194335'},
     ClientCreator._get_client_args: {'555e1e41f93df7558c8305a60466681e3a267ef3'},
     ClientCreator._register_s3_events: {'da3fc62a131d63964c8daa0f52124b092fd8f1b4'},
+    ClientCreator._load_service_model: {'9ff9d1d37d8c70565a036d1d002dba32006b048e'},
 
     BaseClient._make_api_call: {'0c59329d4c8a55b88250b512b5e69239c42246fb'},
     BaseClient._make_request: {'033a386f7d1025522bea7f2bbca85edc5c8aafd2'},
@@ -125,6 +135,18 @@ _API_DIGESTS = {
         {'0dd2986a4cbb38764ec747075306a33117e86c3d'},
     CachedCredentialFetcher._get_cached_credentials:
         {'a9f8c348d226e62122972da9ccc025365b6803d6'},
+    CachedCredentialFetcher._load_from_cache:
+        {'b0ffe0d7963bfb019f5ea83005f9fbfa8c410d37'},
+    CachedCredentialFetcher._is_expired:
+        {'c4667e7c918eb95c239d6df57fd5926b38336173'},
+    JSONFileCache.__init__:
+        {'8eae34cb035dfefd7b3f36a07094beac306a9078'},
+    JSONFileCache.__getitem__:
+        {'af42e0aff48553a21b228d2fc9dc2aa868fbcf89'},
+    JSONFileCache.__setitem__:
+        {'6231899af00ac141c24dc80aa72c579736f4f764'},
+    JSONFileCache._convert_cache_key:
+        {'d9b1891ce621b86ae14bd8599369762eb25e80b1'},
     AssumeRoleCredentialFetcher._get_credentials:
         {'5c575634bc0a713c10e5668f28fbfa8779d5a1da'},
     AssumeRoleCredentialFetcher._create_client:
@@ -156,7 +178,10 @@ _API_DIGESTS = {
         {'0907c1ad5573bc5c0fc87efb601a6c4c3fcf34ae'},
     ProfileProviderBuilder._create_sso_provider:
         {'258e6d07bdf40ea2c7551bae0cd6e1ab58e4e502'},
+    ConfigProvider.__init__: {'9f0aa5464e0e93f184abee96e12bb1628ade6756'},
     ConfigProvider.load: {'8fb32140086dce65fa28be8edd3ac0d22698c3ae'},
+    SharedCredentialProvider.__init__:
+        {'71f99ce18205f9106f307a56b24468258055bb47'},
     SharedCredentialProvider.load: {'c0be1fe376d25952461ca18d9bef4b4340203441'},
     ProcessProvider.__init__: {'2e870ec0c6b0bc8483fa9b1159ef68bbd7a12c56'},
     ProcessProvider.load: {'aac90e2c8823939f09936b9c883e67503128e438'},
@@ -183,6 +208,7 @@ _API_DIGESTS = {
         {'602930a78e0e64e3b313a046aab5edc3bcf5c2d9'},
     CanonicalNameCredentialSourcer._get_provider:
         {'c028b9776383cc566be10999745b6082f458d902'},
+    BotoProvider.__init__: {'08fa4508b5827ca5e69569477aa259d07a17280c'},
     BotoProvider.load: {'9351b8565c2c969937963fc1d3fbc8b3b6d8ccc1'},
     OriginalEC2Provider.load: {'bde9af019f01acf3848a6eda125338b2c588c1ab'},
     create_credential_resolver: {'c6a08bfc59a4e8f59c8b7a846dbb74db649101fd'},
@@ -215,6 +241,10 @@ _API_DIGESTS = {
     PageIterator.__iter__: {'56b3a1e30f488e2f1f5d5309db42fd5ad8a3895d'},
     PageIterator.result_key_iters: {'04d3c647bd98caba3687df80e650fea517a0068e'},
     PageIterator.build_full_result: {'afe8cd8daad2cf32ae34f877985ab79501bf7742'},
+    # Used by ParallelScanIterator
+    PageIterator._get_next_token: {'1fc634a0df8644020465e68503612ebaf707aef8'},
+    PageIterator._make_request: {'855d024e98131e9871e364d53345858ad6a20656'},
+    PageIterator.search: {'560a248d650e0500bee90a6f14da96ce9c77dda9'},
     ResultKeyIterator: {'f71d98959ccda5e05e35cf3cf224fbc9310d33bb'},
 
     # parsers.py
@@ -225,11 +255,17 @@ _API_DIGESTS = {
     JSONParser._create_event_stream: {'0564ba55383a71cc1ba3e5be7110549d7e9992f5'},
     RestJSONParser._create_event_stream: {'0564ba55383a71cc1ba3e5be7110549d7e9992f5'},
 
+    # loaders.py
+    create_loader: {'b38abed914b63a17b5f293391614a8f72b9d4066'},
+    # AioLoader relies on the cache key format
+    instance_cache: {'caea42b119d64a99163f4e9fc8351263819945c7'},
+
     # response.py
     StreamingBody: {'b77bd0903f9013bc47c01f91c6d9bfb8a504d106'},
 
     # session.py
     Session.__init__: {'ccf156a76beda3425fb54363f3b2718dc0445f6d'},
+    Session._register_data_loader: {'2775ba1f36e6be899299c0735502b24b9bc77ee1'},
     Session._register_response_parser_factory:
         {'d6cd5a8b1b473b0ec3b71db5f621acfb12cc412c'},
     Session.create_client: {'36f4e718fc4bada66808c2f98fa71835c09076f7'},
@@ -257,6 +293,8 @@ _API_DIGESTS = {
     generate_db_auth_token: {'5f5a758458c007107a23124192339f747472dc75'},
 
     # utils.py
+    # projected output shapes shadow the cached members, see paginate.py
+    CachedProperty: {'08220fc794c5b402480eafe38175f9f6e51af532'},
     ContainerMetadataFetcher.__init__:
         {'46d90a7249ba8389feb487779b0a02e6faa98e57'},
     ContainerMetadataFetcher.retrieve_full_uri:
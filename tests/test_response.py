@@ -1,8 +1,13 @@
+import base64
+import gzip
+import hashlib
 import io
+import mmap
+import zlib
 
 import pytest
 from aiobotocore import response
-from botocore.exceptions import IncompleteReadError
+from botocore.exceptions import ChecksumError, IncompleteReadError
 
 
 # https://github.com/boto/botocore/blob/develop/tests/unit/test_response.py
@@ -181,3 +186,200 @@ async def test_streaming_line_empty_body():
         AsyncBytesIO(b''), content_length=0,
     )
     await assert_lines(stream.iter_lines(), [])
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_default_chunk_size_follows_content_length():
+    body = AsyncBytesIO(b'a' * 64 * 1024)
+    stream = response.StreamingBody(body, content_length=64 * 1024)
+    chunks = await _tolist(stream)
+    assert [len(chunk) for chunk in chunks] == [4096] * 16
+
+    stream = response.StreamingBody(AsyncBytesIO(b'abcde'),
+                                    content_length=None)
+    assert stream._default_chunk_size() == 1024
+    stream = response.StreamingBody(AsyncBytesIO(b''),
+                                    content_length=str(1024 ** 3))
+    assert stream._default_chunk_size() == 256 * 1024
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_body_readinto():
+    body = AsyncBytesIO(b'1234567890')
+    stream = response.StreamingBody(body, content_length=10)
+    buffer = bytearray(4)
+    assert await stream.readinto(buffer) == 4
+    assert buffer == b'1234'
+    assert await stream.readinto(memoryview(buffer)[1:]) == 3
+    assert buffer == b'1567'
+    assert await stream.readinto(buffer) == 3
+    assert buffer[:3] == b'890'
+    assert await stream.readinto(buffer) == 0
+    assert stream.tell() == 10
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_body_readinto_validates_content_length():
+    body = AsyncBytesIO(b'123456789')
+    stream = response.StreamingBody(body, content_length=10)
+    buffer = bytearray(16)
+    assert await stream.readinto(buffer) == 9
+    with pytest.raises(IncompleteReadError):
+        await stream.readinto(buffer)
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_body_readinto_exactly():
+    body = AsyncBytesIO(b'1234567890')
+    stream = response.StreamingBody(body, content_length=10)
+    buffer = bytearray(6)
+    assert await stream.readinto_exactly(buffer) == 6
+    assert buffer == b'123456'
+    with pytest.raises(IncompleteReadError):
+        await stream.readinto_exactly(buffer)
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_body_readinto_copies_in_place():
+    data = b'1234567890'
+    body = AsyncBytesIO(data)
+    stream = response.StreamingBody(body, content_length=10)
+    with mmap.mmap(-1, 14) as destination:
+        view = memoryview(destination)
+        assert await stream.readinto_exactly(view[2:12]) == 10
+        # the data was copied into the destination, around which nothing
+        # was written
+        assert destination[:] == b'\0\0' + data + b'\0\0'
+        view.release()
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_line_iter_long_line():
+    body = AsyncBytesIO(b'a' * 100000 + b'\r\nb\r')
+    stream = response.StreamingBody(body, content_length=100004)
+    await assert_lines(stream.iter_lines(), [b'a' * 100000, b'b'])
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_line_iter_delimiter():
+    for chunk_size in range(1, 10):
+        body = AsyncBytesIO(b'a||b\n||c|')
+        stream = response.StreamingBody(body, content_length=9)
+        await assert_lines(
+            stream.iter_lines(chunk_size, delimiter=b'||'),
+            [b'a', b'b\n', b'c|'],
+        )
+        body = AsyncBytesIO(b'a||b\n||c|')
+        stream = response.StreamingBody(body, content_length=9)
+        await assert_lines(
+            stream.iter_lines(chunk_size, keepends=True, delimiter=b'||'),
+            [b'a||', b'b\n||', b'c|'],
+        )
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_line_iter_max_line_length():
+    body = AsyncBytesIO(b'1234\n123456\n')
+    stream = response.StreamingBody(body, content_length=12)
+    lines = stream.iter_lines(2, max_line_length=4)
+    assert await lines.__anext__() == b'1234'
+    with pytest.raises(ValueError):
+        await lines.__anext__()
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_line_iter_gzip():
+    data = gzip.compress(b'{"a": 1}\n{"a": 2}\n{"a"') + gzip.compress(b': 3}')
+    for chunk_size in (1, 7, 1024):
+        stream = response.StreamingBody(AsyncBytesIO(data),
+                                        content_length=len(data))
+        await assert_lines(
+            stream.iter_lines(chunk_size, decompress='gzip'),
+            [b'{"a": 1}', b'{"a": 2}', b'{"a": 3}'],
+        )
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_line_iter_zstd():
+    zstandard = pytest.importorskip('zstandard')
+    data = zstandard.ZstdCompressor().compress(b'1\n2\n3')
+    stream = response.StreamingBody(AsyncBytesIO(data),
+                                    content_length=len(data))
+    await assert_lines(stream.iter_lines(4, decompress='zstd'),
+                       [b'1', b'2', b'3'])
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_body_checksum_from_headers():
+    data = b'1234567890' * 100
+    crc32 = base64.b64encode(zlib.crc32(data).to_bytes(4, 'big')).decode()
+    sha256 = base64.b64encode(hashlib.sha256(data).digest()).decode()
+    headers = {
+        'etag': '"%s"' % hashlib.md5(data).hexdigest(),
+        'x-amz-checksum-crc32': crc32,
+        'x-amz-checksum-sha256': sha256,
+    }
+    for algorithm, expected in [('crc32', crc32), ('sha256', sha256),
+                                ('md5', None)]:
+        stream = response.StreamingBody(AsyncBytesIO(data), len(data),
+                                        headers=headers)
+        stream.set_checksum(algorithm)
+        assert b''.join(await _tolist(stream.iter_chunks(7))) == data
+        if expected is not None:
+            assert stream.checksum == expected
+
+        stream = response.StreamingBody(AsyncBytesIO(data[::-1]), len(data),
+                                        headers=headers)
+        stream.set_checksum(algorithm)
+        with pytest.raises(ChecksumError):
+            await stream.read()
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_body_checksum_readinto():
+    data = b'1234567890'
+    crc32 = base64.b64encode(zlib.crc32(data).to_bytes(4, 'big')).decode()
+    stream = response.StreamingBody(AsyncBytesIO(data[::-1]), len(data))
+    stream.set_checksum('crc32', expected=crc32)
+    buffer = bytearray(5)
+    await stream.readinto_exactly(buffer)
+    # the mismatch is raised as soon as the whole body was read
+    with pytest.raises(ChecksumError):
+        await stream.readinto_exactly(buffer)
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_streaming_body_checksum_not_verifiable():
+    data = b'1234567890'
+    headers = {
+        # multipart ETag and checksum
+        'etag': '"%s-2"' % hashlib.md5(data).hexdigest(),
+        'x-amz-checksum-crc32': 'AAAAAA==-2',
+    }
+    for algorithm in ('md5', 'crc32'):
+        stream = response.StreamingBody(AsyncBytesIO(data), len(data),
+                                        headers=headers)
+        stream.set_checksum(algorithm)
+        assert await stream.read() == data
+    assert stream.checksum == base64.b64encode(
+        zlib.crc32(data).to_bytes(4, 'big')).decode()
+
+    stream = response.StreamingBody(AsyncBytesIO(data), len(data))
+    await stream.read(1)
+    with pytest.raises(ValueError):
+        stream.set_checksum('md5')
+    with pytest.raises(ValueError):
+        response.StreamingBody(AsyncBytesIO(data), 10).set_checksum('md4')
@@ -1,5 +1,14 @@
+import asyncio
+import functools
+import os
+import subprocess
+import sys
+
+import mock
 import pytest
 
+from aiobotocore.session import AioSession
+
 
 @pytest.mark.moto
 @pytest.mark.asyncio
@@ -14,3 +23,91 @@ async def test_get_service_data(session):
     await session.get_service_data('s3')
 
     assert handler_called
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_get_service_data_concurrent_loads_deduplicated(session):
+    loader = session.get_component('data_loader')
+    load_service_model = loader.load_service_model
+    num_loads = 0
+
+    @functools.wraps(load_service_model)
+    def counting_load(*args, **kwargs):
+        nonlocal num_loads
+        num_loads += 1
+        return load_service_model(*args, **kwargs)
+
+    loader.load_service_model = counting_load
+
+    results = await asyncio.gather(*[
+        session.get_service_data('ec2') for _ in range(10)])
+
+    assert num_loads == 1
+    assert all(result is results[0] for result in results)
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_preload_models(session):
+    await session.preload_models(['s3'])
+    loader = session.get_component('data_loader')
+    cached = {key[1:3] for key in loader._cache
+              if key[0] == 'load_service_model'}
+    assert {('s3', 'service-2'), ('s3', 'paginators-1'),
+            ('s3', 'waiters-2')} <= cached
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_model_snapshot(session, tempdir):
+    path = os.path.join(tempdir, 'models.pickle')
+    await session.write_model_snapshot(path, ['s3', 'dynamodb'])
+
+    new_session = AioSession()
+    assert await new_session.load_model_snapshot(path)
+
+    # nothing should be read from the JSON data files
+    with mock.patch('botocore.loaders.JSONFileLoader.load_file',
+                    side_effect=AssertionError):
+        service_data = await new_session.get_service_data('dynamodb')
+    assert service_data['metadata']['endpointPrefix'] == 'dynamodb'
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_model_snapshot_other_botocore_version(session, tempdir):
+    path = os.path.join(tempdir, 'models.pickle')
+    await session.write_model_snapshot(path, ['s3'])
+
+    new_session = AioSession()
+    with mock.patch('botocore.__version__', '0.0.1'):
+        assert not await new_session.load_model_snapshot(path)
+    loader = new_session.get_component('data_loader')
+    assert not loader._cache
+
+
+@pytest.mark.moto
+def test_import_defers_heavy_modules():
+    code = ('import sys, aiobotocore; '
+            'print(sorted(m for m in sys.modules if m in {}))'.format(
+                ('aiohttp', 'aiobotocore.credentials',
+                 'aiobotocore.endpoint', 'aioitertools')))
+    output = subprocess.check_output([sys.executable, '-c', code])
+    assert output.strip() == b'[]'
+
+
+@pytest.mark.moto
+def test_lazy_credentials_names():
+    import aiobotocore.credentials
+    import aiobotocore.session
+
+    assert aiobotocore.session.AioCredentials is \
+        aiobotocore.credentials.AioCredentials
+    with mock.patch('aiobotocore.session.create_credential_resolver') as \
+            create_credential_resolver:
+        session = AioSession()
+        assert session.get_component('credential_provider') is \
+            create_credential_resolver.return_value
+    assert aiobotocore.session.create_credential_resolver is \
+        aiobotocore.credentials.create_credential_resolver
@@ -0,0 +1,376 @@
+import asyncio
+import io
+import mmap
+import os
+from unittest import mock
+
+import pytest
+from botocore.exceptions import ConnectionClosedError, IncompleteReadError
+
+from aiobotocore import response
+from aiobotocore.transfer import ParallelDownloader, ParallelUploader, \
+    S3ObjectReader
+
+
+_DATA = os.urandom(300 * 1024 + 17)
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+@pytest.mark.parametrize('use_mmap', [False, True])
+async def test_download_file(s3_client, bucket_name, create_object, tmpdir,
+                             use_mmap):
+    await create_object('key', body=_DATA)
+    filename = str(tmpdir.join('key'))
+    downloader = ParallelDownloader(
+        s3_client, part_size=64 * 1024, max_concurrency=3,
+        io_chunk_size=10 * 1024)
+    head = await downloader.download_file(
+        filename, use_mmap=use_mmap, verify_md5=True,
+        Bucket=bucket_name, Key='key')
+    assert head['ContentLength'] == len(_DATA)
+    with open(filename, 'rb') as f:
+        assert f.read() == _DATA
+    assert os.listdir(str(tmpdir)) == ['key']
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_download_empty_file(s3_client, bucket_name, create_object,
+                                   tmpdir):
+    await create_object('key', body=b'')
+    filename = str(tmpdir.join('key'))
+    downloader = ParallelDownloader(s3_client)
+    for use_mmap in (False, True):
+        await downloader.download_file(filename, use_mmap=use_mmap,
+                                       Bucket=bucket_name, Key='key')
+        assert os.path.getsize(filename) == 0
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_download_into_buffer(s3_client, bucket_name, create_object):
+    await create_object('key', body=_DATA)
+    downloader = ParallelDownloader(s3_client, part_size=100 * 1024)
+    assert await downloader.download_bytes(
+        verify_md5=True, Bucket=bucket_name, Key='key') == _DATA
+
+    buffer = bytearray(len(_DATA) + 1)
+    await downloader.download_into(buffer, Bucket=bucket_name, Key='key')
+    assert buffer[:-1] == _DATA
+
+    with pytest.raises(ValueError):
+        await downloader.download_into(bytearray(10), Bucket=bucket_name,
+                                       Key='key')
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_download_retries_parts(s3_client, bucket_name, create_object):
+    await create_object('key', body=_DATA)
+    readinto_exactly = response.StreamingBody.readinto_exactly
+    calls = []
+
+    async def flaky_readinto_exactly(self, buffer):
+        calls.append(len(buffer))
+        if len(calls) == 2:
+            raise IncompleteReadError(actual_bytes=0,
+                                      expected_bytes=len(buffer))
+        return await readinto_exactly(self, buffer)
+
+    downloader = ParallelDownloader(s3_client, part_size=100 * 1024,
+                                    max_concurrency=1)
+    with mock.patch.object(response.StreamingBody, 'readinto_exactly',
+                           flaky_readinto_exactly):
+        data = await downloader.download_bytes(Bucket=bucket_name, Key='key')
+    assert data == _DATA
+    # the second part was requested twice
+    assert len(calls) == 5
+
+    downloader = ParallelDownloader(s3_client, part_size=100 * 1024,
+                                    max_attempts=1)
+    calls.clear()
+    with mock.patch.object(response.StreamingBody, 'readinto_exactly',
+                           flaky_readinto_exactly):
+        with pytest.raises(IncompleteReadError):
+            await downloader.download_bytes(Bucket=bucket_name, Key='key')
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_download_requests_ranges_of_one_version(
+        s3_client, bucket_name, create_object):
+    await create_object('key', body=_DATA)
+    head = await s3_client.head_object(Bucket=bucket_name, Key='key')
+    requests = []
+
+    def capture(params, **kwargs):
+        requests.append(params)
+
+    s3_client.meta.events.register(
+        'before-parameter-build.s3.GetObject', capture)
+    downloader = ParallelDownloader(s3_client, part_size=100 * 1024)
+    await downloader.download_bytes(Bucket=bucket_name, Key='key')
+
+    assert sorted(request['Range'] for request in requests) == [
+        'bytes=0-102399', 'bytes=102400-204799', 'bytes=204800-307199',
+        'bytes=307200-307216']
+    assert all(request['IfMatch'] == head['ETag'] for request in requests)
+
+
+_LARGE_DATA = os.urandom(12 * 1024 * 1024 + 3)
+
+
+async def _get_object_data(s3_client, bucket_name, key):
+    response = await s3_client.get_object(Bucket=bucket_name, Key=key)
+    async with response['Body'] as stream:
+        return await stream.read()
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+@pytest.mark.parametrize('use_mmap', [False, True])
+async def test_upload_file(s3_client, bucket_name, tmpdir, use_mmap):
+    filename = str(tmpdir.join('key'))
+    with open(filename, 'wb') as f:
+        f.write(_LARGE_DATA)
+    progress = []
+    uploader = ParallelUploader(s3_client, multipart_threshold=5 * 1024 * 1024,
+                                part_size=5 * 1024 * 1024, max_concurrency=2)
+    response = await uploader.upload_file(
+        filename, use_mmap=use_mmap, callback=progress.append,
+        Bucket=bucket_name, Key='key', ContentType='text/plain')
+    assert response['ETag'].endswith('-3"')
+    assert sorted(progress) == [2 * 1024 * 1024 + 3] + [5 * 1024 * 1024] * 2
+    assert await _get_object_data(s3_client, bucket_name, 'key') == \
+        _LARGE_DATA
+    head = await s3_client.head_object(Bucket=bucket_name, Key='key')
+    assert head['ContentType'] == 'text/plain'
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_upload_bytes_below_threshold(s3_client, bucket_name):
+    progress = []
+    uploader = ParallelUploader(s3_client)
+    await uploader.upload_bytes(_DATA, callback=progress.append,
+                                Bucket=bucket_name, Key='key')
+    assert progress == [len(_DATA)]
+    assert await _get_object_data(s3_client, bucket_name, 'key') == _DATA
+
+
+def test_upload_part_size():
+    uploader = ParallelUploader(None, part_size=1024)
+    assert uploader._get_part_size(100 * 1024 * 1024) == 5 * 1024 * 1024
+    # at most 10000 parts
+    assert uploader._get_part_size(100 * 1024 ** 3) == 11 * 1024 * 1024
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_upload_retries_parts(s3_client, bucket_name):
+    upload_part = s3_client.upload_part
+    calls = []
+
+    async def flaky_upload_part(**kwargs):
+        calls.append(kwargs['PartNumber'])
+        if len(calls) == 1:
+            raise ConnectionClosedError(endpoint_url='')
+        return await upload_part(**kwargs)
+
+    uploader = ParallelUploader(s3_client, multipart_threshold=0,
+                                part_size=5 * 1024 * 1024, max_concurrency=1)
+    with mock.patch.object(s3_client, 'upload_part', flaky_upload_part):
+        await uploader.upload_bytes(_LARGE_DATA, Bucket=bucket_name,
+                                    Key='key')
+    assert calls == [1, 1, 2, 3]
+    assert await _get_object_data(s3_client, bucket_name, 'key') == \
+        _LARGE_DATA
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_upload_aborts_on_failure(s3_client, bucket_name):
+    upload_part = s3_client.upload_part
+
+    async def failing_upload_part(**kwargs):
+        if kwargs['PartNumber'] == 2:
+            raise ValueError('boom')
+        return await upload_part(**kwargs)
+
+    uploader = ParallelUploader(s3_client, multipart_threshold=0,
+                                part_size=5 * 1024 * 1024)
+    with mock.patch.object(s3_client, 'upload_part', failing_upload_part):
+        with pytest.raises(ValueError):
+            await uploader.upload_bytes(_LARGE_DATA, Bucket=bucket_name,
+                                        Key='key')
+    uploads = await s3_client.list_multipart_uploads(Bucket=bucket_name)
+    assert not uploads.get('Uploads')
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_upload_aborts_on_cancel(s3_client, bucket_name):
+    started = asyncio.Event()
+
+    async def hanging_upload_part(**kwargs):
+        started.set()
+        await asyncio.sleep(60)
+
+    uploader = ParallelUploader(s3_client, multipart_threshold=0,
+                                part_size=5 * 1024 * 1024)
+    with mock.patch.object(s3_client, 'upload_part', hanging_upload_part):
+        task = asyncio.ensure_future(uploader.upload_bytes(
+            _LARGE_DATA, Bucket=bucket_name, Key='key'))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    uploads = await s3_client.list_multipart_uploads(Bucket=bucket_name)
+    assert not uploads.get('Uploads')
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_object_reader(s3_client, bucket_name, create_object):
+    await create_object('key', body=_DATA)
+    ranges = []
+
+    def capture(params, **kwargs):
+        ranges.append(params['Range'])
+
+    s3_client.meta.events.register(
+        'before-parameter-build.s3.GetObject', capture)
+    block_size = 64 * 1024
+    async with S3ObjectReader(s3_client, block_size=block_size,
+                              read_ahead=0, Bucket=bucket_name,
+                              Key='key') as f:
+        assert f.size == len(_DATA)
+        assert await f.seek(-8, io.SEEK_END) == len(_DATA) - 8
+        assert await f.read(8) == _DATA[-8:]
+        assert f.tell() == len(_DATA)
+        assert await f.read() == b''
+
+        await f.seek(-100, io.SEEK_END)
+        assert await f.read(4) == _DATA[-100:-96]
+        # both reads were served by the last block
+        assert ranges == ['bytes=262144-307216']
+
+        await f.seek(block_size - 10)
+        assert await f.read(20) == _DATA[block_size - 10:block_size + 10]
+        await f.seek(10, io.SEEK_CUR)
+        assert await f.read() == _DATA[block_size + 20:]
+        assert len(ranges) == 5
+
+        with pytest.raises(ValueError):
+            await f.seek(-1)
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_object_reader_coalesces_reads(s3_client, bucket_name,
+                                             create_object):
+    await create_object('key', body=_DATA)
+    ranges = []
+
+    def capture(params, **kwargs):
+        ranges.append(params['Range'])
+
+    s3_client.meta.events.register(
+        'before-parameter-build.s3.GetObject', capture)
+    async with S3ObjectReader(s3_client, block_size=64 * 1024,
+                              max_cached_blocks=1, Bucket=bucket_name,
+                              Key='key') as f:
+        first, second = await asyncio.gather(f.read(10), f.read(10))
+        assert first == second == _DATA[:10]
+        assert ranges == ['bytes=0-65535']
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_object_reader_reads_ahead(s3_client, bucket_name,
+                                         create_object):
+    await create_object('key', body=_DATA)
+    ranges = []
+
+    def capture(params, **kwargs):
+        ranges.append(params['Range'])
+
+    s3_client.meta.events.register(
+        'before-parameter-build.s3.GetObject', capture)
+    block_size = 64 * 1024
+    async with S3ObjectReader(s3_client, block_size=block_size,
+                              read_ahead=2, Bucket=bucket_name,
+                              Key='key') as f:
+        chunks = [await f.read(block_size // 2)]
+        assert len(ranges) == 1
+        chunks.append(await f.read(block_size // 2))
+        # the next two blocks are requested once reads are sequential
+        assert sorted(f._pending_blocks) == [1, 2]
+        while True:
+            chunk = await f.read(block_size // 2)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        assert b''.join(chunks) == _DATA
+        assert len(ranges) == 5
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+async def test_object_reader_limits_concurrency(s3_client, bucket_name,
+                                                create_object):
+    await create_object('key', body=_DATA)
+    get_object = s3_client.get_object
+    active = []
+    max_active = 0
+
+    async def tracking_get_object(**kwargs):
+        nonlocal max_active
+        active.append(kwargs['Range'])
+        max_active = max(max_active, len(active))
+        try:
+            await asyncio.sleep(0.01)
+            return await get_object(**kwargs)
+        finally:
+            active.remove(kwargs['Range'])
+
+    with mock.patch.object(s3_client, 'get_object', tracking_get_object):
+        async with S3ObjectReader(s3_client, block_size=16 * 1024,
+                                  max_concurrency=3, Bucket=bucket_name,
+                                  Key='key') as f:
+            assert await f.read() == _DATA
+    assert max_active == 3
+
+
+@pytest.mark.moto
+@pytest.mark.asyncio
+@pytest.mark.parametrize('multipart_threshold', [0, 100 * 1024 * 1024])
+async def test_upload_file_closes_mmap(s3_client, bucket_name, tmpdir,
+                                       multipart_threshold):
+    filename = str(tmpdir.join('key'))
+    with open(filename, 'wb') as f:
+        f.write(_LARGE_DATA)
+    maps = []
+
+    class TrackingMmap(mmap.mmap):
+        def __init__(self, *args, **kwargs):
+            maps.append(self)
+
+    uploader = ParallelUploader(s3_client,
+                                multipart_threshold=multipart_threshold,
+                                part_size=5 * 1024 * 1024)
+    with mock.patch('mmap.mmap', TrackingMmap):
+        await uploader.upload_file(filename, use_mmap=True,
+                                   Bucket=bucket_name, Key='key')
+    # the parts were sent, the memory map was closed on return
+    map_, = maps
+    assert map_.closed
+    assert await _get_object_data(s3_client, bucket_name, 'key') == \
+        _LARGE_DATA
+
+
+def test_object_reader_created_outside_event_loop():
+    # nothing is bound to an event loop until the reader is used
+    reader = S3ObjectReader(None, Bucket='bucket', Key='key')
+    assert reader._semaphore is None